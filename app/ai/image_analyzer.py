@@ -7,20 +7,55 @@ useful for the buy/skip/watch scoring model:
   - Risk flags (water damage, mattresses, heavy furniture)
   - Organization quality (neat / moderate / chaotic)
   - Visible brand names
+
+Calls are async so batches of listings overlap their Claude round-trips;
+VISION_CONCURRENCY (default 8) caps how many requests are in flight at once,
+and IMAGE_FETCH_CONCURRENCY (default 8) caps concurrent image downloads.
+
+Results are cached in the vision_cache table keyed by SHA-256 of the image
+bytes, so re-analyzing the same photo is a local lookup instead of a paid
+Claude call.  Entries older than VISION_CACHE_TTL_DAYS are ignored and purged.
 """
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import json
 import logging
+import os
+from datetime import timedelta
 from typing import Optional
 
 import httpx
 
+try:
+    import anthropic
+except ImportError:  # optional dependency — only needed for vision analysis
+    anthropic = None
+
+from app.database import SessionLocal
+from app.models import VisionCache, utc_now
+
 logger = logging.getLogger(__name__)
 
 VISION_MODEL = "claude-sonnet-4-6"
 
+_VISION_SEM = asyncio.Semaphore(int(os.getenv("VISION_CONCURRENCY", "8")))
+
+# Image downloads in flight at once, and distinct URLs per batch round
+IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", "8"))
+VISION_BATCH_SIZE       = 64
+
+VISION_CACHE_TTL_DAYS = 30
+
+# Shared async client, created on first use so its connection pool is reused
+_ANTHROPIC_CLIENT = None
+
+# Image URL → sha256 of its bytes, so cached URLs skip the download entirely
+_URL_SHA_CACHE: dict = {}
+_URL_SHA_CACHE_MAX = 1024
+
 _SYSTEM = (
     "You are an expert storage unit resale analyst. "
     "A buyer resells items on eBay and Facebook Marketplace. "
@@ -61,7 +96,7 @@ Definitions:
 """
 
 
-def analyze_listing_images(image_urls: list) -> Optional[dict]:
+async def analyze_listing_images(image_urls: list) -> Optional[dict]:
     """
     Analyze the primary listing image using Claude Vision.
 
@@ -71,50 +106,67 @@ def analyze_listing_images(image_urls: list) -> Optional[dict]:
     Returns:
         Structured dict of signals, or None on failure.
     """
-    if not image_urls:
-        return None
+    return (await analyze_listing_images_batch([image_urls]))[0]
 
-    url = image_urls[0]
 
+async def _fetch_image(
+    http: httpx.AsyncClient, sem: asyncio.Semaphore, url: str
+) -> Optional[tuple]:
+    """Download an image: (sha, media_type, image_bytes), or None on failure."""
     try:
-        # Download image bytes
-        with httpx.Client(timeout=20) as http:
-            r = http.get(url)
+        # Stream image bytes into a single growing buffer
+        image_bytes = bytearray()
+        async with sem, http.stream("GET", url) as r:
             r.raise_for_status()
-            image_bytes = r.content
             media_type = r.headers.get("content-type", "image/jpeg").split(";")[0].strip()
             if not media_type.startswith("image/"):
                 media_type = "image/jpeg"
+            async for chunk in r.aiter_bytes(65536):
+                image_bytes.extend(chunk)
+
+        sha = hashlib.sha256(image_bytes).hexdigest()
+        _remember_url(url, sha)
+        return sha, media_type, image_bytes
+
+    except Exception as exc:
+        logger.warning(f"Image download failed ({url}): {exc}")
+        return None
+
 
-        image_b64 = base64.standard_b64encode(image_bytes).decode("utf-8")
-
-        # Call Claude Vision (sync client)
-        import anthropic  # imported here to keep startup fast when key not set
-        client = anthropic.Anthropic()
-        message = client.messages.create(
-            model=VISION_MODEL,
-            max_tokens=512,
-            system=_SYSTEM,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": image_b64,
+async def _analyze_image(sha: str, media_type: str, image_bytes: bytearray) -> Optional[dict]:
+    """Send one image to Claude Vision; returns the parsed signals (caller caches them)."""
+    try:
+        # Base64 of a multi-MB photo is CPU work — keep it off the event loop
+        image_b64 = (await asyncio.to_thread(base64.b64encode, image_bytes)).decode("ascii")
+        del image_bytes  # only the base64 copy is needed from here on
+
+        # Call Claude Vision (async client, bounded by _VISION_SEM)
+        client = _get_client()
+        async with _VISION_SEM:
+            message = await client.messages.create(
+                model=VISION_MODEL,
+                max_tokens=512,
+                system=_SYSTEM,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "image",
+                                "source": {
+                                    "type": "base64",
+                                    "media_type": media_type,
+                                    "data": image_b64,
+                                },
                             },
-                        },
-                        {
-                            "type": "text",
-                            "text": _PROMPT,
-                        },
-                    ],
-                }
-            ],
-        )
+                            {
+                                "type": "text",
+                                "text": _PROMPT,
+                            },
+                        ],
+                    }
+                ],
+            )
 
         raw = message.content[0].text.strip()
 
@@ -126,12 +178,141 @@ def analyze_listing_images(image_urls: list) -> Optional[dict]:
                 raw = raw[4:].strip()
 
         signals = json.loads(raw)
-        logger.info(f"Vision analysis complete: org={signals.get('organization_level')} url={url}")
+        logger.info(f"Vision analysis complete: org={signals.get('organization_level')} sha={sha}")
         return signals
 
     except json.JSONDecodeError as exc:
         logger.warning(f"Vision response not valid JSON: {exc}")
         return None
     except Exception as exc:
-        logger.warning(f"Image analysis failed ({url}): {exc}")
+        logger.warning(f"Image analysis failed (sha={sha}): {exc}")
         return None
+
+
+def _get_client():
+    """Return the shared AsyncAnthropic client, creating it on first call."""
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is None:
+        if anthropic is None:
+            raise RuntimeError("anthropic package is not installed")
+        _ANTHROPIC_CLIENT = anthropic.AsyncAnthropic()
+    return _ANTHROPIC_CLIENT
+
+
+def purge_vision_cache(max_age_days: int = VISION_CACHE_TTL_DAYS) -> int:
+    """Delete cached vision results older than max_age_days.  Returns rows removed."""
+    cutoff = utc_now() - timedelta(days=max_age_days)
+    with SessionLocal() as db:
+        removed = db.query(VisionCache).filter(VisionCache.created_at < cutoff).delete()
+        db.commit()
+    return removed
+
+
+# Cache reads/writes are sync DB work: the batch calls them once per round,
+# through asyncio.to_thread, never per image on the event loop.
+
+def _cache_get_many(shas: set) -> dict:
+    """sha → signals for every unexpired cache entry among shas."""
+    if not shas:
+        return {}
+    cutoff = utc_now() - timedelta(days=VISION_CACHE_TTL_DAYS)
+    with SessionLocal() as db:
+        rows = db.query(VisionCache.sha256, VisionCache.signals_json).filter(
+            VisionCache.sha256.in_(shas), VisionCache.created_at >= cutoff
+        )
+        return {sha: json.loads(signals_json) for sha, signals_json in rows}
+
+
+def _cache_put_many(signals_by_sha: dict) -> None:
+    if not signals_by_sha:
+        return
+    now = utc_now()
+    with SessionLocal() as db:
+        for sha, signals in signals_by_sha.items():
+            db.merge(VisionCache(
+                sha256       = sha,
+                signals_json = json.dumps(signals),
+                created_at   = now,
+            ))
+        db.commit()
+
+
+def _remember_url(url: str, sha: str) -> None:
+    if len(_URL_SHA_CACHE) >= _URL_SHA_CACHE_MAX:
+        _URL_SHA_CACHE.pop(next(iter(_URL_SHA_CACHE)))  # evict oldest
+    _URL_SHA_CACHE[url] = sha
+
+
+async def analyze_listing_images_batch(image_url_lists: list) -> list:
+    """
+    Analyze many listings concurrently.
+
+    Each distinct primary image URL is downloaded once, then Claude is called
+    once per distinct image (SHA-256 of its bytes), so listings that share a
+    placeholder or facility photo share a single analysis.  URLs are worked
+    through VISION_BATCH_SIZE at a time over one pooled client, so at most
+    that many images are held in memory and IMAGE_FETCH_CONCURRENCY are
+    downloading at once.
+
+    Args:
+        image_url_lists: One list of image URLs per listing.
+
+    Returns:
+        Signals dict (or None on failure) per listing, in input order.
+    """
+    urls = list(dict.fromkeys(image_urls[0] for image_urls in image_url_lists if image_urls))
+
+    sha_by_url: dict = {}
+    signals_by_sha: dict = {}
+    sem = asyncio.Semaphore(IMAGE_FETCH_CONCURRENCY)
+    limits = httpx.Limits(
+        max_connections=IMAGE_FETCH_CONCURRENCY, max_keepalive_connections=IMAGE_FETCH_CONCURRENCY
+    )
+    async with httpx.AsyncClient(timeout=20, limits=limits) as http:
+        for i in range(0, len(urls), VISION_BATCH_SIZE):
+            await _analyze_round(
+                http, sem, urls[i:i + VISION_BATCH_SIZE], sha_by_url, signals_by_sha
+            )
+
+    return [
+        signals_by_sha.get(sha_by_url.get(image_urls[0])) if image_urls else None
+        for image_urls in image_url_lists
+    ]
+
+
+async def _analyze_round(
+    http:           httpx.AsyncClient,
+    sem:            asyncio.Semaphore,
+    urls:           list,
+    sha_by_url:     dict,
+    signals_by_sha: dict,
+) -> None:
+    """Resolve one slice of URLs to signals, filling sha_by_url and signals_by_sha."""
+    # URLs seen before resolve to their sha without a download when the
+    # cache still holds signals for it
+    known = {url: _URL_SHA_CACHE[url] for url in urls if url in _URL_SHA_CACHE}
+    signals_by_sha.update(await asyncio.to_thread(
+        _cache_get_many, set(known.values()) - signals_by_sha.keys()
+    ))
+    sha_by_url.update((url, sha) for url, sha in known.items() if sha in signals_by_sha)
+
+    to_fetch = [url for url in urls if url not in sha_by_url]
+    fetched = await asyncio.gather(*(_fetch_image(http, sem, url) for url in to_fetch))
+    sha_by_url.update((url, image[0]) for url, image in zip(to_fetch, fetched) if image)
+    signals_by_sha.update(await asyncio.to_thread(
+        _cache_get_many, {image[0] for image in fetched if image} - signals_by_sha.keys()
+    ))
+
+    pending: dict = {}  # sha → (media_type, bytes) still needing a Claude call
+    for image in fetched:
+        if image is not None and image[0] not in signals_by_sha:
+            pending.setdefault(image[0], image[1:])
+    del fetched
+
+    # Each image's bytes are handed to (and dropped by) its own analysis
+    # task, so they are freed as soon as that image is encoded
+    shas = list(pending)
+    results = await asyncio.gather(*(_analyze_image(sha, *pending.pop(sha)) for sha in shas))
+    analyzed = {sha: signals for sha, signals in zip(shas, results) if signals is not None}
+    await asyncio.to_thread(_cache_put_many, analyzed)
+    signals_by_sha.update(analyzed)
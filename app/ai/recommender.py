@@ -24,7 +24,8 @@ Bid count:
 Time remaining:
   > 24 hrs  +5 · 6-24 hrs  +3 · < 6 hrs  -5
 
-Description keyword boosts (independent — all matching categories apply):
+Description keyword boosts (independent — all matching categories apply;
+keywords match at the start of a word, so "tvs" counts but "activity" doesn't):
   tools / toolbox / dewalt / milwaukee / craftsman  +15
   electronics / tv / laptop / gaming                +10
   boxes / sealed / retail                           +10
@@ -39,6 +40,14 @@ Description keyword penalties:
 
 No images  -10
 
+Vision signals (only when Claude Vision ran on the primary image):
+  tools / contractor unit            +10
+  electronics                         +5
+  sealed boxes / retail inventory     +5
+  neat organization +5 · chaotic -5
+  mattress visible                   -10
+  water damage                       -15
+
 Tiers
 ─────
   A+  85-100  → BUY
@@ -49,11 +58,19 @@ Tiers
 """
 from __future__ import annotations
 
-import json
 import logging
-from datetime import datetime
-from typing import TYPE_CHECKING, Optional
-
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime, timezone
+from functools import lru_cache
+from hashlib import blake2b
+from math import nextafter
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import orjson
+from sqlalchemy import Select, exists, select
 from sqlalchemy.orm import Session
 
 if TYPE_CHECKING:
@@ -64,28 +81,141 @@ logger = logging.getLogger(__name__)
 MODEL_VERSION = "heuristic-v3"
 
 
+class ScoringRow(NamedTuple):
+    """
+    The Listing columns the scorer reads, loaded without ORM hydration.
+    Anything with these attributes (including a Listing) can be scored.
+    """
+    id:               int
+    auction_type:     Optional[str]
+    unit_size:        Optional[str]
+    unit_size_sqft:   Optional[float]
+    current_bid:      Optional[float]
+    bid_count:        Optional[int]
+    auction_end_time: Optional[datetime]
+    description:      Optional[str]
+    has_images:       bool
+
+
+def scoring_rows_select() -> Select:
+    """SELECT producing ScoringRow columns; has_images is a correlated EXISTS."""
+    from app.models import Listing, ListingImage
+
+    return select(
+        Listing.id,
+        Listing.auction_type,
+        Listing.unit_size,
+        Listing.unit_size_sqft,
+        Listing.current_bid,
+        Listing.bid_count,
+        Listing.auction_end_time,
+        Listing.description,
+        exists().where(ListingImage.listing_id == Listing.id).label("has_images"),
+    )
+
+
+# (needle, label, delta) — first needle found in the normalized value wins.
+_AUCTION_TABLE = (
+    ("lien",    "Lien unit",       15),
+    ("manager", "Manager special",  5),
+    ("charity", "Charity unit",    -5),
+)  # private seller / unknown = 0 pts — every scraped listing so far; no arm matches
+# Size order follows two rules, in this priority:
+#   1. A needle that contains another must come before it: "15x10" contains
+#      "5x10", so 15x10 sits above 5x10 despite its 0% share.
+#   2. Otherwise, rows are ordered by observed share of scraped listings
+#      (noted per row), so the common sizes match first.
+_SIZE_TABLE = (
+    ("10x10", "10×10 unit", 15),  # 21%
+    ("15x10", "10×15 unit", 18),  #  0%
+    ("5x10",  "5×10 unit",   8),  # 20%
+    ("5x5",   "5×5 unit",    2),  # 11%
+    ("10x20", "10×20 unit", 20),  #  9%
+    ("10x15", "10×15 unit", 18),  #  3%
+    ("20x10", "10×20 unit", 20),  #  0%
+    ("10x5",  "5×10 unit",   8),  #  0%
+)
+
+# Description keyword categories in reporting order: (group, label, delta, words)
+_KEYWORD_CATEGORIES = (
+    ("tools",       "Tools / branded tools",     15,
+     ("tools", "toolbox", "dewalt", "milwaukee", "craftsman")),
+    ("electronics", "Electronics mentioned",     10, ("electronics", "tv", "laptop", "gaming")),
+    ("boxes",       "Boxes / sealed / retail",   10, ("boxes", "sealed", "retail")),
+    ("furniture",   "Furniture mentioned",        5, ("furniture", "dresser", "couch")),
+    ("mattress",    "Mattress mentioned",       -15, ("mattress",)),
+    ("clothing",    "Clothing",                 -10, ("clothes", "clothing")),
+    ("trash",       "Trash / junk / empty",     -20, ("trash", "junk", "empty")),
+    ("water",       "Water / damage mentioned", -15, ("water", "damage")),
+)
+
+# One alternation over every keyword; the named group that matched is the category
+_KEYWORD_RE = re.compile("|".join(
+    rf"(?P<{group}>\b(?:{'|'.join(words)}))"
+    for group, _, _, words in _KEYWORD_CATEGORIES
+))
+
+# Numeric scoring bands.  bisect_left(bounds, x) picks the first band whose
+# inclusive upper bound is >= x.  "Under $100" is exclusive, so its bound is
+# the largest float below 100 and a $100 bid lands in the $100–200 band.
+_BID_BOUNDS = (nextafter(100.0, 0.0), 200.0, 400.0)
+_BID_BANDS = (
+    ("Bid under $100 (${:.0f})", 15),
+    ("Bid $100–200 (${:.0f})",   10),
+    ("Bid $200–400 (${:.0f})",    5),
+    ("Bid over $400 (${:.0f})",  -10),
+)
+_BID_COUNT_BOUNDS = (5, 15, 25)
+_BID_COUNT_BANDS = (
+    ("{} bids — low competition",      10),
+    ("{} bids — moderate competition",  5),
+    None,                                    # 16-25 bids: neutral, no note
+    ("{} bids — high competition",     -10),
+)
+_HOURS_BOUNDS = (6.0, 24.0)
+_HOURS_BANDS = (
+    ("Under 6 hrs remaining", -5),
+    ("6–24 hrs remaining",     3),
+    ("Over 24 hrs remaining",  5),
+)
+
+# Digest of the rule tables above, part of every input_hash so that editing a
+# table re-scores stored recommendations.  Rules that live in code (tiers,
+# vision deltas, value estimate) still need a MODEL_VERSION bump.
+_RULES_DIGEST = blake2b(repr((
+    _AUCTION_TABLE, _SIZE_TABLE, _KEYWORD_CATEGORIES,
+    _BID_BOUNDS, _BID_BANDS, _BID_COUNT_BOUNDS, _BID_COUNT_BANDS,
+    _HOURS_BOUNDS, _HOURS_BANDS,
+)).encode(), digest_size=8).hexdigest()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Public interface
 # ─────────────────────────────────────────────────────────────────────────────
 
 def generate_recommendation(
     listing: "Listing",
-    db: Session,
-    use_vision: bool = False,
+    db: Optional[Session] = None,
+    vision: Optional[dict] = None,
+    now_ts: Optional[float] = None,
 ) -> dict:
     """
     Score a listing and return a dict suitable for AIRecommendation fields.
     reasoning is stored as a JSON array: [{"label": str, "delta": int|None}, ...]
     The first element is always the summary header with delta=None.
+    vision is the signals dict from analyze_listing_images(), if it was run.
+    now_ts (epoch seconds) lets batch callers read the clock once for all listings.
     """
-    score, factors = _score_listing(listing)
+    if now_ts is None:
+        now_ts = time.time()
+    score, factors = _score_listing(listing, vision, now_ts=now_ts)
     tier, recommendation = _get_tier(score)
 
     estimated_value   = _estimate_value(listing, score)
     suggested_max_bid = round(estimated_value * 0.35, 0) if estimated_value else None
 
     summary = {"label": f"Score {score}/100 · Tier {tier}", "delta": None}
-    reasoning_json = json.dumps([summary] + factors)
+    reasoning_json = orjson.dumps([summary] + factors).decode()
 
     return {
         "recommendation":    recommendation,
@@ -94,9 +224,70 @@ def generate_recommendation(
         "suggested_max_bid": suggested_max_bid,
         "reasoning":         reasoning_json,
         "model_version":     MODEL_VERSION,
+        "input_hash":        recommendation_input_hash(listing, vision, now_ts=now_ts),
     }
 
 
+def generate_recommendations_batch(
+    listings: list,
+    vision_by_listing: Optional[dict] = None,
+    now_ts: Optional[float] = None,
+) -> list:
+    """
+    Score many listings in one pass.
+
+    listings are ScoringRow tuples (see scoring_rows_select) or Listing
+    objects; nothing is queried per listing.  The clock is read once for
+    the whole batch.  Returns AIRecommendation field dicts including
+    listing_id, ready for bulk_insert_mappings.  Listings that fail to
+    score are logged and left out.
+    """
+    if now_ts is None:
+        now_ts = time.time()
+    vision_by_listing = vision_by_listing or {}
+    rows = []
+    for listing in listings:
+        try:
+            rec_data = generate_recommendation(
+                listing, vision=vision_by_listing.get(listing.id), now_ts=now_ts
+            )
+        except Exception as exc:
+            logger.warning(f"Recommendation skipped listing {listing.id}: {exc}")
+            continue
+        rows.append({**rec_data, "listing_id": listing.id})
+    return rows
+
+
+def recommendation_input_hash(
+    listing: "Listing",
+    vision: Optional[dict] = None,
+    *,
+    now_ts: float,
+) -> str:
+    """
+    Fingerprint of every input the score depends on.
+
+    Time remaining enters only as its scoring bucket, so the hash changes
+    when the listing would score differently — not every second.  The
+    model version and rule tables are part of the key too.  Callers
+    compare it to AIRecommendation.input_hash to skip unchanged listings.
+    """
+    key = (
+        MODEL_VERSION,
+        _RULES_DIGEST,
+        listing.auction_type,
+        listing.unit_size,
+        listing.unit_size_sqft,
+        listing.current_bid,
+        listing.bid_count,
+        _time_bucket(_hours_remaining(listing, now_ts)),
+        listing.description,
+        bool(listing.has_images),
+        orjson.dumps(vision, option=orjson.OPT_SORT_KEYS) if vision else None,
+    )
+    return blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Tier mapping
 # ─────────────────────────────────────────────────────────────────────────────
@@ -113,7 +304,7 @@ def _get_tier(score: int) -> tuple:
 # Main scoring function
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _score_listing(listing: "Listing") -> tuple:
+def _score_listing(listing: "Listing", vision: Optional[dict] = None, *, now_ts: float) -> tuple:
     """Return (score 0-100, list of {label, delta} factor dicts)."""
     score: int   = 0
     factors: list = []
@@ -125,88 +316,68 @@ def _score_listing(listing: "Listing") -> tuple:
 
     # ── 1. Auction type ───────────────────────────────────────────────────
     atype = (listing.auction_type or "").lower()
-    if "lien" in atype:
-        add("Lien unit", 15)
-    elif "manager" in atype:
-        add("Manager special", 5)
-    elif "charity" in atype:
-        add("Charity unit", -5)
-    # private seller / unknown = 0 pts
+    for needle, label, delta in _AUCTION_TABLE:
+        if needle in atype:
+            add(label, delta)
+            break
 
     # ── 2. Unit size ──────────────────────────────────────────────────────
     size_norm = (listing.unit_size or "").lower().replace(" ", "")
-    if "10x20" in size_norm or "20x10" in size_norm:
-        add("10×20 unit", 20)
-    elif "10x15" in size_norm or "15x10" in size_norm:
-        add("10×15 unit", 18)
-    elif "10x10" in size_norm:
-        add("10×10 unit", 15)
-    elif "5x10" in size_norm or "10x5" in size_norm:
-        add("5×10 unit", 8)
-    elif "5x5" in size_norm:
-        add("5×5 unit", 2)
+    for needle, label, delta in _SIZE_TABLE:
+        if needle in size_norm:
+            add(label, delta)
+            break
 
     # ── 3. Current bid ────────────────────────────────────────────────────
     bid = listing.current_bid or 0.0
-    if bid < 100:
-        add(f"Bid under $100 (${bid:.0f})", 15)
-    elif bid <= 200:
-        add(f"Bid $100–200 (${bid:.0f})", 10)
-    elif bid <= 400:
-        add(f"Bid $200–400 (${bid:.0f})", 5)
-    else:
-        add(f"Bid over $400 (${bid:.0f})", -10)
+    label, delta = _BID_BANDS[bisect_left(_BID_BOUNDS, bid)]
+    add(label.format(bid), delta)
 
     # ── 4. Bid count ──────────────────────────────────────────────────────
     n_bids = listing.bid_count or 0
-    if n_bids <= 5:
-        add(f"{n_bids} bids — low competition", 10)
-    elif n_bids <= 15:
-        add(f"{n_bids} bids — moderate competition", 5)
-    elif n_bids <= 25:
-        pass  # neutral, no note
-    else:
-        add(f"{n_bids} bids — high competition", -10)
+    band = _BID_COUNT_BANDS[bisect_left(_BID_COUNT_BOUNDS, n_bids)]
+    if band:
+        label, delta = band
+        add(label.format(n_bids), delta)
 
     # ── 5. Time remaining ─────────────────────────────────────────────────
-    if listing.auction_end_time:
-        now   = datetime.utcnow()
-        delta = listing.auction_end_time - now
-        hours = delta.total_seconds() / 3600
-        if hours > 24:
-            add("Over 24 hrs remaining", 5)
-        elif hours > 6:
-            add("6–24 hrs remaining", 3)
-        else:
-            add("Under 6 hrs remaining", -5)
+    bucket = _time_bucket(_hours_remaining(listing, now_ts))
+    if bucket is not None:
+        add(*_HOURS_BANDS[bucket])
 
     # ── 6. Description keyword analysis ──────────────────────────────────
-    desc = (listing.description or "").lower()
+    desc = _normalize(listing.description)
 
     if not desc.strip():
         add("No description", -5)
     else:
-        if any(w in desc for w in ["tools", "toolbox", "dewalt", "milwaukee", "craftsman"]):
-            add("Tools / branded tools", 15)
-        if any(w in desc for w in ["electronics", "tv", "laptop", "gaming"]):
-            add("Electronics mentioned", 10)
-        if any(w in desc for w in ["boxes", "sealed", "retail"]):
-            add("Boxes / sealed / retail", 10)
-        if any(w in desc for w in ["furniture", "dresser", "couch"]):
-            add("Furniture mentioned", 5)
-        if "mattress" in desc:
-            add("Mattress mentioned", -15)
-        if any(w in desc for w in ["clothes", "clothing"]):
-            add("Clothing", -10)
-        if any(w in desc for w in ["trash", "junk", "empty"]):
-            add("Trash / junk / empty", -20)
-        if any(w in desc for w in ["water", "damage"]):
-            add("Water / damage mentioned", -15)
+        hit = {m.lastgroup for m in _KEYWORD_RE.finditer(desc)}
+        for group, label, delta, _ in _KEYWORD_CATEGORIES:
+            if group in hit:
+                add(label, delta)
 
     # ── 7. Images ────────────────────────────────────────────────────────
-    if not listing.images:
+    if not listing.has_images:
         add("No images", -10)
 
+    # ── 8. Vision signals ────────────────────────────────────────────────
+    if vision:
+        if vision.get("tools") or vision.get("contractor_unit"):
+            add("Photo: tools / contractor unit", 10)
+        if vision.get("electronics"):
+            add("Photo: electronics", 5)
+        if vision.get("sealed_boxes") or vision.get("retail_inventory"):
+            add("Photo: sealed boxes / retail", 5)
+        org = vision.get("organization_level")
+        if org == "neat":
+            add("Photo: neatly organized", 5)
+        elif org == "chaotic":
+            add("Photo: chaotic pile", -5)
+        if vision.get("mattress_visible"):
+            add("Photo: mattress visible", -10)
+        if vision.get("water_damage"):
+            add("Photo: water damage", -15)
+
     score = max(0, min(100, score))
     return score, factors
 
@@ -228,6 +399,29 @@ def _estimate_value(listing: "Listing", score: int) -> Optional[float]:
 # Utilities
 # ─────────────────────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=4096)
+def _normalize(text: Optional[str]) -> str:
+    """Lowercase ASCII form of free text (accents folded, other non-ASCII dropped)."""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def _hours_remaining(listing: "Listing", now_ts: float) -> Optional[float]:
+    end = listing.auction_end_time
+    if not end:
+        return None
+    # auction_end_time is stored as naive UTC
+    return (end.replace(tzinfo=timezone.utc).timestamp() - now_ts) / 3600
+
+
+def _time_bucket(hours: Optional[float]) -> Optional[int]:
+    """Which time-remaining scoring band hours falls in (None = no end time)."""
+    if hours is None:
+        return None
+    return bisect_left(_HOURS_BOUNDS, hours)
+
+
 def _parse_size_sqft(size_str: Optional[str]) -> Optional[float]:
     """Parse '10x10' or '5 x 10' style strings to square footage."""
     if not size_str:
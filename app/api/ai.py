@@ -1,14 +1,29 @@
 """
 API routes for AI recommendation engine.
 """
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import logging
+import time
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import AIRecommendation, Listing
-from app.ai.recommender import generate_recommendation
+from app.models import AIRecommendation, Listing, ListingImage
+from app.ai.recommender import (
+    ScoringRow,
+    generate_recommendation,
+    recommendation_input_hash,
+    scoring_rows_select,
+)
+from app.ai.image_analyzer import analyze_listing_images_batch, purge_vision_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Listings scored per worker-thread hop in /recommend-all
+SCORE_CHUNK_SIZE = 256
+
 
 @router.post("/recommend/{listing_id}")
 def recommend(listing_id: int, db: Session = Depends(get_db)):
@@ -38,30 +53,119 @@ def recommend(listing_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/recommend-all")
-def recommend_all(use_vision: bool = False, db: Session = Depends(get_db)):
-    """Generate recommendations for every listing that doesn't have one yet."""
-    from app.models import Listing
-    listings = db.query(Listing).all()
-    created = updated = skipped = 0
+async def recommend_all(
+    background_tasks: BackgroundTasks,
+    use_vision: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Generate or refresh recommendations for every listing.
+
+    Listings whose scoring inputs are unchanged since their stored
+    recommendation (same input_hash) are left alone.  With use_vision, the
+    primary image of every listing is analyzed by Claude Vision concurrently
+    before scoring; expired vision cache entries are purged after the
+    response is sent.  The DB reads and writes and the chunked scoring all
+    run on worker threads; only the vision calls run on the event loop.
+    """
+    listings, urls_by_listing, existing = await run_in_threadpool(
+        _load_scoring_inputs, db, use_vision
+    )
+
+    vision_by_listing: dict = {}
+    if use_vision:
+        batch = list(urls_by_listing.items())
+        results = await analyze_listing_images_batch([urls for _, urls in batch])
+        vision_by_listing = {
+            listing_id: signals for (listing_id, _), signals in zip(batch, results) if signals
+        }
+        background_tasks.add_task(purge_vision_cache)
+
+    now_ts = time.time()
+    chunks = await asyncio.gather(*(
+        asyncio.to_thread(
+            _score_chunk, listings[i:i + SCORE_CHUNK_SIZE], existing, vision_by_listing, now_ts
+        )
+        for i in range(0, len(listings), SCORE_CHUNK_SIZE)
+    ))
+
+    inserts: list = []
+    updates: list = []
+    skipped = unchanged = 0
+    for chunk_inserts, chunk_updates, chunk_unchanged, chunk_skipped in chunks:
+        inserts += chunk_inserts
+        updates += chunk_updates
+        unchanged += chunk_unchanged
+        skipped += chunk_skipped
+
+    await run_in_threadpool(_save_recommendations, db, inserts, updates)
+    created, updated = len(inserts), len(updates)
+    return {
+        "created":   created,
+        "updated":   updated,
+        "unchanged": unchanged,
+        "skipped":   skipped,
+        "total":     len(listings),
+    }
+
+
+def _load_scoring_inputs(db: Session, use_vision: bool) -> tuple:
+    """
+    Load everything /recommend-all needs from the DB (runs in a worker thread).
+    Returns (scoring rows, image URLs by listing id, existing (rec id, hash) by listing id).
+    """
+    listings = [ScoringRow._make(row) for row in db.execute(scoring_rows_select())]
+
+    urls_by_listing: dict = {}
+    if use_vision:
+        for listing_id, url in (
+            db.query(ListingImage.listing_id, ListingImage.url)
+            .order_by(ListingImage.listing_id, ListingImage.order_index)
+        ):
+            urls_by_listing.setdefault(listing_id, []).append(url)
+
+    existing = {
+        listing_id: (rec_id, input_hash)
+        for listing_id, rec_id, input_hash in
+        db.query(AIRecommendation.listing_id, AIRecommendation.id, AIRecommendation.input_hash)
+        .all()
+    }
+    return listings, urls_by_listing, existing
+
+
+def _save_recommendations(db: Session, inserts: list, updates: list) -> None:
+    """Bulk-write scored recommendations and commit (runs in a worker thread)."""
+    db.bulk_insert_mappings(AIRecommendation, inserts)
+    db.bulk_update_mappings(AIRecommendation, updates)
+    db.commit()
+
+
+def _score_chunk(listings: list, existing: dict, vision_by_listing: dict, now_ts: float) -> tuple:
+    """
+    Score a slice of listings (runs in a worker thread, no DB access).
+    Returns (insert mappings, update mappings, unchanged count, skipped count).
+    """
+    inserts: list = []
+    updates: list = []
+    skipped = unchanged = 0
     for listing in listings:
+        vision = vision_by_listing.get(listing.id)
         try:
-            rec_data = generate_recommendation(listing, db, use_vision=use_vision)
-            existing = db.query(AIRecommendation).filter(
-                AIRecommendation.listing_id == listing.id
-            ).first()
-            if existing:
-                for k, v in rec_data.items():
-                    setattr(existing, k, v)
-                updated += 1
-            else:
-                db.add(AIRecommendation(listing_id=listing.id, **rec_data))
-                created += 1
+            if listing.id in existing:
+                rec_id, stored_hash = existing[listing.id]
+                if stored_hash == recommendation_input_hash(listing, vision, now_ts=now_ts):
+                    unchanged += 1
+                    continue
+            rec_data = generate_recommendation(listing, vision=vision, now_ts=now_ts)
         except Exception as exc:
             skipped += 1
-            import logging
-            logging.getLogger(__name__).warning(f"Skipped listing {listing.id}: {exc}")
-    db.commit()
-    return {"created": created, "updated": updated, "skipped": skipped, "total": len(listings)}
+            logger.warning(f"Skipped listing {listing.id}: {exc}")
+            continue
+        if listing.id in existing:
+            updates.append({**rec_data, "id": rec_id})
+        else:
+            inserts.append({**rec_data, "listing_id": listing.id})
+    return inserts, updates, unchanged, skipped
 
 
 @router.get("/recommendations")
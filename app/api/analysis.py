@@ -3,8 +3,7 @@ API routes for pattern analysis on winning vs losing units.
 """
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from collections import defaultdict
+from sqlalchemy import case, func
 from app.database import get_db
 from app.models import PnLEntry, Listing, ListingTagMap, BidRecord
 
@@ -15,27 +14,20 @@ router = APIRouter()
 def win_loss_by_tag(db: Session = Depends(get_db)):
     """Break down win rate and average net profit by unit tag."""
     rows = (
-        db.query(ListingTagMap.tag, PnLEntry.net_profit)
+        db.query(ListingTagMap.tag, *_outcome_columns())
         .join(Listing, Listing.id == ListingTagMap.listing_id)
         .join(PnLEntry, PnLEntry.listing_id == Listing.id)
+        .group_by(ListingTagMap.tag)
         .all()
     )
-    stats: dict = defaultdict(lambda: {"count": 0, "wins": 0, "total_net": 0.0})
-    for tag, net in rows:
-        key = tag.value if hasattr(tag, "value") else str(tag)
-        stats[key]["count"] += 1
-        stats[key]["total_net"] += net or 0.0
-        if (net or 0) > 0:
-            stats[key]["wins"] += 1
-
     result = []
-    for tag, s in stats.items():
+    for tag, count, wins, total_net in rows:
         result.append({
-            "tag": tag,
-            "count": s["count"],
-            "win_rate": round(s["wins"] / s["count"], 3),
-            "avg_net_profit": round(s["total_net"] / s["count"], 2),
-            "total_net_profit": round(s["total_net"], 2),
+            "tag": tag.value if hasattr(tag, "value") else str(tag),
+            "count": count,
+            "win_rate": round(wins / count, 3),
+            "avg_net_profit": round(total_net / count, 2),
+            "total_net_profit": round(total_net, 2),
         })
     return sorted(result, key=lambda x: x["avg_net_profit"], reverse=True)
 
@@ -43,26 +35,20 @@ def win_loss_by_tag(db: Session = Depends(get_db)):
 @router.get("/win-loss-by-size")
 def win_loss_by_size(db: Session = Depends(get_db)):
     """Break down win rate and profitability by unit size."""
+    size_key = func.coalesce(func.nullif(Listing.unit_size, ""), "unknown")
     rows = (
-        db.query(Listing.unit_size, PnLEntry.net_profit)
+        db.query(size_key, *_outcome_columns())
         .join(PnLEntry, PnLEntry.listing_id == Listing.id)
+        .group_by(size_key)
         .all()
     )
-    stats: dict = defaultdict(lambda: {"count": 0, "wins": 0, "total_net": 0.0})
-    for size, net in rows:
-        key = size or "unknown"
-        stats[key]["count"] += 1
-        stats[key]["total_net"] += net or 0.0
-        if (net or 0) > 0:
-            stats[key]["wins"] += 1
-
     result = []
-    for size, s in stats.items():
+    for size, count, wins, total_net in rows:
         result.append({
             "unit_size": size,
-            "count": s["count"],
-            "win_rate": round(s["wins"] / s["count"], 3),
-            "avg_net_profit": round(s["total_net"] / s["count"], 2),
+            "count": count,
+            "win_rate": round(wins / count, 3),
+            "avg_net_profit": round(total_net / count, 2),
         })
     return sorted(result, key=lambda x: x["avg_net_profit"], reverse=True)
 
@@ -87,3 +73,12 @@ def bid_efficiency(db: Session = Depends(get_db)):
                 "net_profit": net,
             })
     return result
+
+
+def _outcome_columns() -> tuple:
+    """Aggregate columns shared by the win/loss breakdowns: (count, wins, total_net)."""
+    return (
+        func.count(PnLEntry.id),
+        func.sum(case((PnLEntry.net_profit > 0, 1), else_=0)),
+        func.sum(func.coalesce(PnLEntry.net_profit, 0.0)),
+    )
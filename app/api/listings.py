@@ -3,9 +3,11 @@ API routes for listing management.
 """
 import asyncio
 import logging
+import os
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import nulls_last
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, contains_eager, selectinload
+from sqlalchemy import func, nulls_last
 from typing import List, Optional
 from pydantic import BaseModel
 from app.database import get_db
@@ -15,6 +17,16 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# One Chromium shared by all /fetch-images requests, launched on first use;
+# each request only opens its own context.  Closed on app shutdown.
+_PLAYWRIGHT = None
+_BROWSER = None
+_BROWSER_LOCK = asyncio.Lock()
+_IMAGE_SCRAPE_SEM = asyncio.Semaphore(int(os.getenv("IMAGE_SCRAPE_CONCURRENCY", "3")))
+
+IMAGE_CDN  = "media.st-prd-1.aws.storagetreasures.com"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp")
+
 
 @router.get("")
 def get_listings(
@@ -32,22 +44,41 @@ def get_listings(
         q = q.filter(Listing.status == status)
     if state:
         q = q.filter(Listing.state == state)
-    total = q.count()
 
-    # Sort by AI score descending; listings with no recommendation go last
-    q = q.outerjoin(AIRecommendation, AIRecommendation.listing_id == Listing.id)
-    items = (
-        q.order_by(nulls_last(AIRecommendation.confidence_score.desc()))
+    # Sort by AI score descending; listings with no recommendation go last.
+    # Relationships read by _listing_dict are loaded up front (one query each)
+    # instead of lazily per row.  The total rides along as a window count
+    # (evaluated before LIMIT/OFFSET), so a page costs one query, not two.
+    page = (
+        q.outerjoin(AIRecommendation, AIRecommendation.listing_id == Listing.id)
+        .add_columns(func.count().over().label("total"))
+        .options(
+            contains_eager(Listing.ai_recommendation),
+            selectinload(Listing.images),
+            selectinload(Listing.bid_record),
+        )
+        .order_by(nulls_last(AIRecommendation.confidence_score.desc()))
         .offset(offset)
         .limit(limit)
         .all()
     )
+    if page:
+        total = page[0].total
+    else:
+        # Offset past the end — no rows to carry the window count
+        total = q.with_entities(func.count(Listing.id)).scalar()
+    items = [row.Listing for row in page]
     return {"total": total, "items": [_listing_dict(l) for l in items]}
 
 
 @router.get("/{listing_id}")
 def get_listing(listing_id: int, db: Session = Depends(get_db)):
-    listing = db.get(Listing, listing_id)
+    listing = db.get(Listing, listing_id, options=[
+        selectinload(Listing.ai_recommendation),
+        selectinload(Listing.images),
+        selectinload(Listing.bid_record),
+        selectinload(Listing.tags),
+    ])
     if not listing:
         raise HTTPException(404, "Listing not found")
     return _listing_dict(listing, full=True)
@@ -106,28 +137,33 @@ def toggle_bid_placed(listing_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{listing_id}/fetch-images")
-def fetch_images(listing_id: int, db: Session = Depends(get_db)):
+async def fetch_images(listing_id: int, db: Session = Depends(get_db)):
     """Use Playwright to scrape all gallery images from the listing's ST page."""
-    listing = db.get(Listing, listing_id)
+    listing = await run_in_threadpool(db.get, Listing, listing_id)
     if not listing:
         raise HTTPException(404, "Listing not found")
     if not listing.url:
         raise HTTPException(400, "Listing has no URL")
 
     try:
-        urls: List[str] = asyncio.run(_scrape_listing_images(listing.url))
+        urls: List[str] = await _scrape_listing_images(listing.url)
     except Exception as exc:
         logger.error(f"fetch-images scrape failed for listing {listing_id}: {exc}")
         raise HTTPException(500, f"Image scrape failed: {exc}")
 
+    return await run_in_threadpool(_save_listing_images, db, listing, urls)
+
+
+def _save_listing_images(db: Session, listing: Listing, urls: List[str]) -> dict:
+    """Append newly scraped image URLs to a listing (runs in the threadpool)."""
     existing_urls = {img.url for img in listing.images}
     new_count = 0
-    for i, url in enumerate(urls):
+    for url in urls:
         if url not in existing_urls:
             db.add(ListingImage(
-                listing_id  = listing_id,
+                listing_id  = listing.id,
                 url         = url,
-                order_index = len(existing_urls) + new_count,
+                order_index = len(existing_urls),
             ))
             existing_urls.add(url)
             new_count += 1
@@ -140,15 +176,36 @@ def fetch_images(listing_id: int, db: Session = Depends(get_db)):
     return {"images": [{"url": img.url, "order": img.order_index} for img in imgs]}
 
 
+async def _get_browser():
+    """Return the shared Chromium instance, launching it if needed."""
+    global _PLAYWRIGHT, _BROWSER
+    async with _BROWSER_LOCK:
+        if _BROWSER is None or not _BROWSER.is_connected():
+            from playwright.async_api import async_playwright
+            if _PLAYWRIGHT is None:
+                _PLAYWRIGHT = await async_playwright().start()
+            _BROWSER = await _PLAYWRIGHT.chromium.launch(headless=True)
+    return _BROWSER
+
+
+async def close_browser() -> None:
+    """Shut down the shared browser and Playwright driver, if started."""
+    global _PLAYWRIGHT, _BROWSER
+    async with _BROWSER_LOCK:
+        if _BROWSER is not None:
+            await _BROWSER.close()
+            _BROWSER = None
+        if _PLAYWRIGHT is not None:
+            await _PLAYWRIGHT.stop()
+            _PLAYWRIGHT = None
+
+
 async def _scrape_listing_images(listing_url: str) -> List[str]:
     """Visit a StorageTreasures listing page and intercept all CDN image URLs."""
-    from playwright.async_api import async_playwright
-
-    CDN = "media.st-prd-1.aws.storagetreasures.com"
-    seen: List[str] = []
+    seen: dict = {}  # insertion-ordered set of image URLs
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
+    async with _IMAGE_SCRAPE_SEM:
+        browser = await _get_browser()
         ctx = await browser.new_context(
             user_agent=(
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -160,9 +217,8 @@ async def _scrape_listing_images(listing_url: str) -> List[str]:
 
         async def on_response(resp) -> None:
             u = resp.url
-            if CDN in u and u not in seen:
-                if any(u.lower().endswith(ext) for ext in (".jpg", ".jpeg", ".png", ".webp")):
-                    seen.append(u)
+            if IMAGE_CDN in u and u not in seen and u.lower().endswith(IMAGE_EXTS):
+                seen[u] = None
 
         page.on("response", on_response)
 
@@ -173,14 +229,14 @@ async def _scrape_listing_images(listing_url: str) -> List[str]:
                 "img", "els => els.map(e => e.src)"
             )
             for src in srcs:
-                if CDN in src and src not in seen:
-                    seen.append(src)
+                if IMAGE_CDN in src:
+                    seen.setdefault(src)
         except Exception as exc:
             logger.warning(f"Playwright page load issue ({listing_url}): {exc}")
         finally:
-            await browser.close()
+            await ctx.close()
 
-    return seen
+    return list(seen)
 
 
 def _listing_dict(listing: Listing, full: bool = False) -> dict:
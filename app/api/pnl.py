@@ -3,10 +3,12 @@ API routes for P&L tracking and inventory management.
 """
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, case, cast, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from datetime import datetime
-from app.database import get_db
+from operator import attrgetter
+from app.database import get_async_db
 from app.models import PnLEntry, InventoryItem
 
 router = APIRouter()
@@ -41,92 +43,128 @@ class InventoryItemCreate(BaseModel):
     notes: Optional[str] = None
 
 
-def _compute_net(entry: PnLEntry) -> float:
-    total_cost = (entry.purchase_price + entry.cleanup_cost +
-                  entry.transport_cost + entry.other_costs)
-    return (entry.gross_revenue or 0.0) - total_cost
+# Field names read straight off validated bodies when building ORM rows
+_PNL_FIELDS = tuple(PnLCreate.model_fields)
+_INVENTORY_FIELDS = tuple(InventoryItemCreate.model_fields)
+
+
+def _fields(data: BaseModel, names: tuple) -> dict:
+    return {name: getattr(data, name) for name in names}
 
 
 @router.get("")
-def list_pnl(db: Session = Depends(get_db)):
-    entries = db.query(PnLEntry).all()
-    return [_pnl_dict(e) for e in entries]
+async def list_pnl(db: AsyncSession = Depends(get_async_db)):
+    # Item counts come from the same GROUP BY query, not a lazy load per entry
+    rows = await db.execute(
+        select(PnLEntry, func.count(InventoryItem.id))
+        .outerjoin(InventoryItem, InventoryItem.pnl_entry_id == PnLEntry.id)
+        .group_by(PnLEntry.id)
+    )
+    return [_pnl_dict(e, inventory_count=n) for e, n in rows]
 
 
 @router.get("/summary")
-def pnl_summary(db: Session = Depends(get_db)):
-    entries = db.query(PnLEntry).all()
-    total_invested = sum(
-        (e.purchase_price + e.cleanup_cost + e.transport_cost + e.other_costs)
-        for e in entries
-    )
-    total_revenue = sum(e.gross_revenue or 0.0 for e in entries)
-    total_net = sum(e.net_profit or 0.0 for e in entries)
-    wins = [e for e in entries if (e.net_profit or 0) > 0]
-    losses = [e for e in entries if (e.net_profit or 0) <= 0]
+async def pnl_summary(db: AsyncSession = Depends(get_async_db)):
+    # One aggregate row instead of hydrating every entry.  Money is summed as
+    # integer cents, so totals are exact and need no rounding afterwards.
+    total_units, invested_c, revenue_c, net_c, win_count = (await db.execute(select(
+        func.count(PnLEntry.id),
+        _sum_cents(PnLEntry.total_cost),
+        _sum_cents(PnLEntry.gross_revenue),
+        _sum_cents(PnLEntry.net_profit),
+        func.coalesce(func.sum(case((PnLEntry.net_profit > 0, 1), else_=0)), 0),
+    ))).one()
     return {
-        "total_units": len(entries),
-        "total_invested": round(total_invested, 2),
-        "total_revenue": round(total_revenue, 2),
-        "total_net_profit": round(total_net, 2),
-        "win_count": len(wins),
-        "loss_count": len(losses),
-        "win_rate": round(len(wins) / len(entries), 3) if entries else 0,
-        "avg_net_per_unit": round(total_net / len(entries), 2) if entries else 0,
+        "total_units": total_units,
+        "total_invested": invested_c / 100,
+        "total_revenue": revenue_c / 100,
+        "total_net_profit": net_c / 100,
+        "win_count": win_count,
+        "loss_count": total_units - win_count,
+        "win_rate": round(win_count / total_units, 3) if total_units else 0,
+        "avg_net_per_unit": round(net_c / total_units) / 100 if total_units else 0,
     }
 
 
+def _sum_cents(column):
+    """SUM of a dollar column as whole cents (0 when there are no rows)."""
+    return func.coalesce(func.sum(cast(func.round(column * 100), Integer)), 0)
+
+
 @router.post("")
-def create_pnl(data: PnLCreate, db: Session = Depends(get_db)):
-    entry = PnLEntry(**data.model_dump())
-    entry.net_profit = _compute_net(entry)
+async def create_pnl(data: PnLCreate, db: AsyncSession = Depends(get_async_db)):
+    entry = PnLEntry(**_fields(data, _PNL_FIELDS))
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
-    return _pnl_dict(entry)
+    await db.commit()
+    await db.refresh(entry)  # picks up trigger-maintained net_profit and total_cost
+    return _pnl_dict(entry, inventory_count=0)
 
 
 @router.patch("/{pnl_id}")
-def update_pnl(pnl_id: int, data: PnLUpdate, db: Session = Depends(get_db)):
-    entry = db.get(PnLEntry, pnl_id)
+async def update_pnl(pnl_id: int, data: PnLUpdate, db: AsyncSession = Depends(get_async_db)):
+    entry = await db.get(PnLEntry, pnl_id)
     if not entry:
         raise HTTPException(404, "P&L entry not found")
-    for field, val in data.model_dump(exclude_none=True).items():
+    for field, val in data.model_dump(exclude_unset=True).items():
         setattr(entry, field, val)
-    entry.net_profit = _compute_net(entry)
-    db.commit()
-    db.refresh(entry)
-    return _pnl_dict(entry)
+    await db.commit()
+    await db.refresh(entry)
+    inventory_count = await db.scalar(
+        select(func.count(InventoryItem.id)).where(InventoryItem.pnl_entry_id == pnl_id)
+    )
+    return _pnl_dict(entry, inventory_count=inventory_count)
 
 
 @router.post("/{pnl_id}/inventory")
-def add_inventory_item(pnl_id: int, item: InventoryItemCreate, db: Session = Depends(get_db)):
-    entry = db.get(PnLEntry, pnl_id)
+async def add_inventory_item(
+    pnl_id: int, item: InventoryItemCreate, db: AsyncSession = Depends(get_async_db)
+):
+    entry = await db.get(PnLEntry, pnl_id)
     if not entry:
         raise HTTPException(404, "P&L entry not found")
-    inv = InventoryItem(pnl_entry_id=pnl_id, **item.model_dump())
+    inv = InventoryItem(pnl_entry_id=pnl_id, **_fields(item, _INVENTORY_FIELDS))
     db.add(inv)
     entry.gross_revenue = (entry.gross_revenue or 0) + (item.sold_price or 0)
-    entry.net_profit = _compute_net(entry)
-    db.commit()
-    db.refresh(inv)
+    await db.commit()
     return {"id": inv.id, "name": inv.name, "sold_price": inv.sold_price}
 
 
-def _pnl_dict(entry: PnLEntry) -> dict:
-    total_cost = (entry.purchase_price + entry.cleanup_cost +
-                  entry.transport_cost + entry.other_costs)
+@router.post("/{pnl_id}/inventory/bulk")
+async def add_inventory_items(
+    pnl_id: int, items: List[InventoryItemCreate], db: AsyncSession = Depends(get_async_db)
+):
+    """Add many inventory items in one INSERT batch and one parent update."""
+    entry = await db.get(PnLEntry, pnl_id)
+    if not entry:
+        raise HTTPException(404, "P&L entry not found")
+    if items:
+        await db.execute(
+            insert(InventoryItem),
+            [{"pnl_entry_id": pnl_id, **_fields(item, _INVENTORY_FIELDS)} for item in items],
+        )
+    entry.gross_revenue = (entry.gross_revenue or 0) + sum(item.sold_price or 0 for item in items)
+    await db.commit()
+    await db.refresh(entry, ["net_profit"])
     return {
-        "id": entry.id,
-        "listing_id": entry.listing_id,
-        "purchase_price": entry.purchase_price,
-        "cleanup_cost": entry.cleanup_cost,
-        "transport_cost": entry.transport_cost,
-        "other_costs": entry.other_costs,
-        "total_cost": round(total_cost, 2),
+        "pnl_id": pnl_id,
+        "added": len(items),
         "gross_revenue": entry.gross_revenue,
         "net_profit": entry.net_profit,
-        "notes": entry.notes,
-        "closed_at": entry.closed_at.isoformat() if entry.closed_at else None,
-        "inventory_count": len(entry.inventory_items),
     }
+
+
+# _pnl_dict output columns, fetched in one attrgetter call per entry
+_PNL_DICT_FIELDS = (
+    "id", "listing_id", "purchase_price", "cleanup_cost", "transport_cost",
+    "other_costs", "total_cost", "gross_revenue", "net_profit", "notes", "closed_at",
+)
+_get_pnl_fields = attrgetter(*_PNL_DICT_FIELDS)
+
+
+def _pnl_dict(entry: PnLEntry, inventory_count: int) -> dict:
+    d = dict(zip(_PNL_DICT_FIELDS, _get_pnl_fields(entry)))
+    d["total_cost"] = round(d["total_cost"], 2)
+    d["inventory_count"] = inventory_count
+    if d["closed_at"] is not None:
+        d["closed_at"] = d["closed_at"].isoformat()
+    return d
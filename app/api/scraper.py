@@ -1,27 +1,47 @@
 """
-API route for running the StorageTreasures scraper synchronously.
+API routes for running the StorageTreasures scraper as a background job.
 
 POST /api/scraper/run
   Body: { state, zip_code, radius_miles, max_pages, auction_types }
-  Returns: { new_listings, total_scraped, recommendations_generated }
-
-The endpoint blocks until the scrape finishes (typically 15-120 seconds
-depending on page count, since Playwright is used for the first page).
-After scraping, recommendations are automatically generated for all new
-listings that don't already have one.
+  Returns: { job_id }
+
+GET /api/scraper/status/{job_id}
+  Returns: { state: "running" | "done" | "error", result?, error? }
+  result: { new_listings, total_scraped, recommendations_generated }
+
+A scrape takes 15-120 seconds depending on page count (Playwright is used
+for the first page), so it runs after the response is sent and the
+dashboard polls for status.  Jobs share one long-lived scraper (and its
+browser, when page 1 needs one) and run one at a time.  After scraping,
+recommendations are automatically generated for all new listings that
+don't already have one.
 """
 from __future__ import annotations
 
 import logging
+import threading
+from functools import lru_cache
 from typing import List, Optional
+from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import insert
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# job_id → {"state": ..., "result"/"error": ...}; in-process, oldest finished evicted
+_JOBS: dict = {}
+_JOBS_MAX = 100
+
+# Scraper shared by every job, so its event loop and Chromium outlive a
+# single scrape.  Jobs run on worker threads and the scraper is not
+# thread-safe, so each job holds _SCRAPER_LOCK while it uses it.
+_SCRAPER = None
+_SCRAPER_LOCK = threading.Lock()
+
 # Mapping from human-readable auction type name to StorageTreasures filter_type int
 _AUCTION_TYPE_MAP = {
     "lien":            "1",
@@ -38,6 +58,12 @@ _AUCTION_TYPE_MAP = {
 }
 
 
+@lru_cache(maxsize=128)
+def _normalize_type(t: str) -> str:
+    """Map a human-readable auction type name to its numeric ST filter ID."""
+    return _AUCTION_TYPE_MAP.get(t.lower().strip(), t)
+
+
 class ScrapeRequest(BaseModel):
     state:         Optional[str]       = None
     zip_code:      Optional[str]       = None
@@ -47,67 +73,109 @@ class ScrapeRequest(BaseModel):
 
 
 @router.post("/run")
-def run_scraper(data: ScrapeRequest):
+def run_scraper(data: ScrapeRequest, background_tasks: BackgroundTasks):
     """
-    Run the scraper synchronously and return results.
+    Start a scrape in the background and return its job id.
 
-    This endpoint blocks for the duration of the scrape.  The caller
-    (dashboard) should show a loading indicator while waiting.
+    Poll GET /api/scraper/status/{job_id} for the outcome.
     """
-    from app.scraper.storage_treasures import StorageTreasuresScraper
+    if len(_JOBS) >= _JOBS_MAX:
+        # Evict the oldest finished job; running ones must stay pollable
+        finished = next(
+            (jid for jid, job in list(_JOBS.items()) if job["state"] != "running"), None
+        )
+        if finished is not None:
+            _JOBS.pop(finished, None)
+    job_id = uuid4().hex
+    _JOBS[job_id] = {"state": "running"}
+    background_tasks.add_task(_run_scrape_job, job_id, data)
+    return {"job_id": job_id}
+
+
+@router.get("/status/{job_id}")
+def scrape_status(job_id: str):
+    job = _JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Scrape job not found")
+    return job
+
+
+def _get_scraper():
+    """Return the shared scraper, creating it on first use (caller holds _SCRAPER_LOCK)."""
+    global _SCRAPER
+    if _SCRAPER is None:
+        from app.scraper.storage_treasures import StorageTreasuresScraper
+        _SCRAPER = StorageTreasuresScraper()
+    return _SCRAPER
+
+
+def close_scraper() -> None:
+    """Shut down the shared scraper's browser and event loop, if started."""
+    global _SCRAPER
+    with _SCRAPER_LOCK:
+        if _SCRAPER is not None:
+            _SCRAPER.close()
+            _SCRAPER = None
+
+
+def _run_scrape_job(job_id: str, data: ScrapeRequest) -> None:
+    """Run one scrape with its own DB session and record the outcome in _JOBS."""
     from app.database import SessionLocal
 
     # Map any human-readable auction type names → numeric IDs, dedupe
-    type_ids = list({
-        _AUCTION_TYPE_MAP.get(t.lower().strip(), t)
-        for t in (data.auction_types or ["1", "2", "3", "4"])
-    })
-    filter_types = ",".join(sorted(type_ids))
+    type_ids = sorted({_normalize_type(t) for t in (data.auction_types or ["1", "2", "3", "4"])})
+    filter_types = ",".join(type_ids)
 
-    db = SessionLocal()
     try:
-        scraper = StorageTreasuresScraper()
-        new_count, total = scraper.fetch_and_save(
-            state        = data.state    or None,
-            zip_code     = data.zip_code or None,
-            radius_miles = data.radius_miles,
-            max_pages    = data.max_pages,
-            filter_types = filter_types,
-            db           = db,
-        )
-        recs_created = _auto_recommend_new(db) if new_count > 0 else 0
-        return {
+        # One transaction for the whole pipeline: committed once at the end,
+        # rolled back if any phase fails.
+        with _SCRAPER_LOCK, SessionLocal.begin() as db:
+            new_count, total = _get_scraper().fetch_and_save(
+                state        = data.state    or None,
+                zip_code     = data.zip_code or None,
+                radius_miles = data.radius_miles,
+                max_pages    = data.max_pages,
+                filter_types = filter_types,
+                db           = db,
+            )
+            recs_created = _auto_recommend_new(db) if new_count > 0 else 0
+        _JOBS[job_id] = {"state": "done", "result": {
             "new_listings":             new_count,
             "total_scraped":            total,
             "recommendations_generated": recs_created,
-        }
+        }}
     except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    finally:
-        db.close()
+        logger.error(f"Scrape job {job_id} failed: {exc}")
+        _JOBS[job_id] = {"state": "error", "error": str(exc)}
 
 
 def _auto_recommend_new(db) -> int:
-    """Generate recommendations for any listing that doesn't have one yet."""
-    from app.models import Listing, AIRecommendation
-    from app.ai.recommender import generate_recommendation
-
-    listings_needing_recs = (
-        db.query(Listing)
-        .outerjoin(AIRecommendation, AIRecommendation.listing_id == Listing.id)
-        .filter(AIRecommendation.id.is_(None))
-        .all()
+    """
+    Generate recommendations for any listing that doesn't have one yet.
+    Runs inside the caller's transaction; the caller commits.
+    """
+    from app.models import AIRecommendation, Listing
+    from app.ai.recommender import (
+        ScoringRow,
+        generate_recommendations_batch,
+        scoring_rows_select,
     )
 
-    created = 0
-    for listing in listings_needing_recs:
-        try:
-            rec_data = generate_recommendation(listing, db)
-            db.add(AIRecommendation(listing_id=listing.id, **rec_data))
-            created += 1
-        except Exception as exc:
-            logger.warning(f"Auto-rec skipped listing {listing.id}: {exc}")
-
-    if created:
-        db.commit()
-    return created
+    # Scoring columns only, in one query; listings that already have a
+    # recommendation are excluded by the anti-join.
+    listings_needing_recs = [
+        ScoringRow._make(row)
+        for row in db.execute(
+            scoring_rows_select()
+            .outerjoin(AIRecommendation, AIRecommendation.listing_id == Listing.id)
+            .where(AIRecommendation.id.is_(None))
+        )
+    ]
+
+    rec_rows = generate_recommendations_batch(listings_needing_recs)
+    if not rec_rows:
+        return 0
+    # OR IGNORE on the unique listing_id: a concurrent scrape job that got
+    # there first wins, instead of failing this whole batch.
+    result = db.execute(insert(AIRecommendation.__table__).prefix_with("OR IGNORE"), rec_rows)
+    return result.rowcount
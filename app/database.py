@@ -1,15 +1,18 @@
 """
 Database engine and session management.
 """
+from hashlib import blake2b
 from pathlib import Path
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from app.models import Base
+from app.models import Base, PNL_TOTAL_COST_SQL
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
 DATABASE_URL = f"sqlite:///{DATA_DIR}/storage_scraper.db"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATA_DIR}/storage_scraper.db"
 
 engine = create_engine(
     DATABASE_URL,
@@ -17,29 +20,137 @@ engine = create_engine(
     echo=False,
 )
 
+
+@event.listens_for(engine, "connect")
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    """WAL lets readers run alongside the writer; NORMAL syncs at checkpoints."""
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=268435456")   # 256 MiB
+    cur.execute("PRAGMA cache_size=-65536")     # 64 MiB
+    cur.close()
+
+
+# Async engine over the same file for `async def` routes (aiosqlite driver).
+# Schema setup and migrations stay on the sync engine.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: attribute access after commit must not lazy-load
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 def init_db() -> None:
-    """Create all tables if they don't exist, then run column migrations."""
+    """
+    Create all tables if they don't exist, then run column migrations.
+
+    Skipped when the schema signature stored by the last successful run
+    matches the current models and migrations.
+    """
+    sig = _schema_signature()
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS _schema_version (key TEXT PRIMARY KEY, value TEXT)"
+        ))
+        stored = conn.execute(
+            text("SELECT value FROM _schema_version WHERE key = 'sig'")
+        ).scalar()
+        conn.commit()
+    if stored == sig:
+        return
+
     Base.metadata.create_all(bind=engine)
     _migrate()
+    with engine.connect() as conn:
+        conn.execute(
+            text("REPLACE INTO _schema_version (key, value) VALUES ('sig', :sig)"), {"sig": sig}
+        )
+        conn.commit()
+
+
+def _schema_signature() -> str:
+    """Hash of every table, column, index, migration and trigger init_db sets up."""
+    tables = sorted(
+        (
+            t.name,
+            tuple((c.name, str(c.type)) for c in t.columns),
+            tuple(sorted(i.name for i in t.indexes)),
+        )
+        for t in Base.metadata.tables.values()
+    )
+    key = repr((tables, REQUIRED_COLUMNS, sorted(PNL_TRIGGERS.items())))
+    return blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+# Columns added after a table's first release: table → [(column, SQL type)]
+REQUIRED_COLUMNS = {
+    "listings": [
+        ("auction_type", "VARCHAR"),
+        ("watched",      "BOOLEAN DEFAULT 0"),
+        ("notes",        "TEXT"),
+    ],
+    "ai_recommendations": [
+        ("input_hash",   "VARCHAR"),
+    ],
+    "pnl_entries": [
+        # ALTER TABLE can only add VIRTUAL generated columns
+        ("total_cost",   f"FLOAT GENERATED ALWAYS AS ({PNL_TOTAL_COST_SQL}) VIRTUAL"),
+    ],
+}
+
+# net_profit is an ordinary column (older DBs already have it), maintained
+# by the database whenever an entry's costs or revenue change.
+_PNL_NET_SQL = (
+    "UPDATE pnl_entries SET net_profit = COALESCE(gross_revenue, 0) - total_cost"
+)
+PNL_TRIGGERS = {
+    "trg_pnl_net_insert": f"""
+        CREATE TRIGGER trg_pnl_net_insert AFTER INSERT ON pnl_entries
+        BEGIN {_PNL_NET_SQL} WHERE id = NEW.id; END
+    """,
+    "trg_pnl_net_update": f"""
+        CREATE TRIGGER trg_pnl_net_update AFTER UPDATE OF
+            purchase_price, cleanup_cost, transport_cost, other_costs, gross_revenue
+        ON pnl_entries
+        BEGIN {_PNL_NET_SQL} WHERE id = NEW.id; END
+    """,
+}
 
 
 def _migrate() -> None:
     """Add columns that may be missing from older DB schemas (SQLite-safe)."""
-    _add_column_if_missing("listings", "auction_type", "VARCHAR")
-    _add_column_if_missing("listings", "watched",      "BOOLEAN DEFAULT 0")
-    _add_column_if_missing("listings", "notes",        "TEXT")
+    with engine.connect() as conn:
+        for table, columns in REQUIRED_COLUMNS.items():
+            # table_xinfo, unlike table_info, also lists generated columns
+            rows = conn.execute(text(f"PRAGMA table_xinfo({table})")).fetchall()
+            existing = {row[1] for row in rows}
+            for column, col_type in columns:
+                if column not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}"))
 
+        triggers = {
+            row[0] for row in
+            conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+        }
+        missing = [name for name in PNL_TRIGGERS if name not in triggers]
+        for name in missing:
+            conn.execute(text(PNL_TRIGGERS[name]))
+        if missing:
+            conn.execute(text(_PNL_NET_SQL))  # bring existing rows in line once
+        conn.commit()
+    _create_missing_indexes()
 
-def _add_column_if_missing(table: str, column: str, col_type: str) -> None:
+
+def _create_missing_indexes() -> None:
+    """create_all() skips indexes on tables that already exist; add any new ones."""
     with engine.connect() as conn:
-        rows = conn.execute(text(f"PRAGMA table_info({table})")).fetchall()
-        existing = {row[1] for row in rows}
-        if column not in existing:
-            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}"))
-            conn.commit()
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        conn.commit()
 
 
 def get_db():
@@ -49,3 +160,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """FastAPI dependency: yields an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
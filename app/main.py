@@ -1,13 +1,15 @@
 """
 FastAPI application entry point.
 """
+import asyncio
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 
-from app.database import init_db
+from app.database import async_engine, init_db
 from app.api import listings, bidding, pnl, analysis, ai, scraper
 
 
@@ -15,6 +17,9 @@ from app.api import listings, bidding, pnl, analysis, ai, scraper
 async def lifespan(app: FastAPI):
     init_db()
     yield
+    await listings.close_browser()
+    await asyncio.to_thread(scraper.close_scraper)  # runs its own event loop
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -24,12 +29,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# The dashboard is served from this app (same origin), so CORS is only
+# needed for other front-ends: set CORS_ORIGINS to a comma-separated list.
+CORS_ORIGINS = [o.strip() for o in os.environ.get("CORS_ORIGINS", "").split(",") if o.strip()]
+if CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_methods=["GET", "POST", "PATCH"],
+        allow_headers=["content-type", "authorization"],
+    )
 
 # API routers — must be registered before the static file catch-all
 app.include_router(listings.router, prefix="/api/listings", tags=["listings"])
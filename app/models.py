@@ -2,10 +2,10 @@
 SQLAlchemy ORM models for storage-scraper.
 All tables defined here; SQLite database used for persistence.
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime,
-    Text, ForeignKey, Enum
+    Text, ForeignKey, Enum, Index, Computed, FetchedValue
 )
 from sqlalchemy.orm import relationship, DeclarativeBase
 import enum
@@ -15,6 +15,11 @@ class Base(DeclarativeBase):
     pass
 
 
+def utc_now() -> datetime:
+    """Current UTC time as a naive datetime, the form DateTime columns here store."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # ---------------------------------------------------------------------------
 # Enums
 # ---------------------------------------------------------------------------
@@ -75,13 +80,24 @@ class Listing(Base):
     tags = relationship("ListingTagMap", back_populates="listing", cascade="all, delete-orphan")
     ai_recommendation = relationship("AIRecommendation", back_populates="listing", uselist=False)
 
+    __table_args__ = (
+        # GET /api/listings: equality filters on state/status, range on end time
+        Index("ix_listings_active", state, status, auction_end_time),
+        # Same without a state filter (dashboard's all-states active view)
+        Index("ix_listings_status_end", status, auction_end_time),
+    )
+
+    @property
+    def has_images(self) -> bool:
+        return bool(self.images)
+
 
 class ListingImage(Base):
     """Images associated with a listing."""
     __tablename__ = "listing_images"
 
     id = Column(Integer, primary_key=True)
-    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False, index=True)
     url = Column(String, nullable=False)
     local_path = Column(String)  # path to downloaded file
     order_index = Column(Integer, default=0)
@@ -95,7 +111,7 @@ class ListingTagMap(Base):
     __tablename__ = "listing_tags"
 
     id = Column(Integer, primary_key=True)
-    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False, index=True)
     tag = Column(Enum(UnitTag), nullable=False)
     confidence = Column(Float, default=1.0)  # 0-1, manual=1.0
     source = Column(String, default="manual")  # "manual" | "ai"
@@ -127,6 +143,12 @@ class BidRecord(Base):
 # P&L
 # ---------------------------------------------------------------------------
 
+# SQL for pnl_entries.total_cost (a generated column; see also database._migrate)
+PNL_TOTAL_COST_SQL = (
+    "purchase_price + COALESCE(cleanup_cost, 0) + "
+    "COALESCE(transport_cost, 0) + COALESCE(other_costs, 0)"
+)
+
 class PnLEntry(Base):
     """Profit and loss record for a won unit."""
     __tablename__ = "pnl_entries"
@@ -138,7 +160,9 @@ class PnLEntry(Base):
     transport_cost = Column(Float, default=0.0)
     other_costs = Column(Float, default=0.0)
     gross_revenue = Column(Float, default=0.0)
-    net_profit = Column(Float)       # computed: gross_revenue - total_costs
+    total_cost = Column(Float, Computed(PNL_TOTAL_COST_SQL))
+    # gross_revenue - total_cost, kept current by triggers (database._migrate)
+    net_profit = Column(Float, server_default=FetchedValue(), server_onupdate=FetchedValue())
     notes = Column(Text)
     closed_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -153,7 +177,7 @@ class InventoryItem(Base):
     __tablename__ = "inventory_items"
 
     id = Column(Integer, primary_key=True)
-    pnl_entry_id = Column(Integer, ForeignKey("pnl_entries.id"), nullable=False)
+    pnl_entry_id = Column(Integer, ForeignKey("pnl_entries.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     category = Column(String)
     quantity = Column(Integer, default=1)
@@ -182,6 +206,21 @@ class AIRecommendation(Base):
     suggested_max_bid = Column(Float)
     reasoning = Column(Text)
     model_version = Column(String)
+    input_hash = Column(String)           # fingerprint of scoring inputs (see recommender)
     generated_at = Column(DateTime, default=datetime.utcnow)
 
     listing = relationship("Listing", back_populates="ai_recommendation")
+
+    __table_args__ = (
+        # GET /api/listings orders by score; listing_id makes the join index-only
+        Index("ix_airec_conf_listing", confidence_score.desc(), listing_id),
+    )
+
+
+class VisionCache(Base):
+    """Claude Vision signals keyed by SHA-256 of the analyzed image bytes."""
+    __tablename__ = "vision_cache"
+
+    sha256 = Column(String, primary_key=True)   # hex digest of image bytes
+    signals_json = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=utc_now)  # entries expire after a TTL
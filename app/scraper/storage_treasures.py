@@ -2,11 +2,14 @@
 StorageTreasures.com scraper.
 
 Strategy:
-  - Page 1: Playwright browser (handles all auth/cookies automatically).
-            Intercepts the API response JSON directly.
-            Also captures the raw request headers for reuse.
-  - Pages 2+: httpx using the same headers captured from Playwright.
-              Falls back to a second Playwright pass if httpx gets a 403.
+  - Page 1: httpx with the request headers cached by the last browser run,
+            when they are fresh and still accepted.  Otherwise a
+            Playwright browser (handles all auth/cookies automatically),
+            which intercepts the API response JSON directly and captures
+            the raw request headers for reuse.
+  - Pages 2+: httpx using the same headers captured from Playwright,
+              up to PAGE_FETCH_CONCURRENCY (default 3) in flight at once.
+              Pagination stops at the first empty page or error (e.g. a 403).
 
 The site's data API:
   GET https://api.st-prd-1.aws.storagetreasures.com/p/auctions
@@ -19,18 +22,25 @@ Image CDN:
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import math
+import mimetypes
+import os
 import random
-import string
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List
+from typing import List, NamedTuple, Optional
 
+import aiofiles
 import httpx
+import orjson
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from app.models import Listing, ListingImage
+from app.models import Listing, ListingImage, utc_now
 from app.database import SessionLocal
 
 logger = logging.getLogger(__name__)
@@ -57,7 +67,7 @@ def _get_zip_coords(zip_code: str) -> Optional[tuple]:
         _ZIP_COORD_CACHE[zip_code] = (lat, lon)
         return (lat, lon)
     except Exception as exc:
-        logger.debug(f"Zip coord lookup failed for {zip_code}: {exc}")
+        logger.debug("Zip coord lookup failed for %s: %s", zip_code, exc)
         return None
 
 def _zip_distance_miles(zip1: str, zip2: str) -> Optional[float]:
@@ -76,18 +86,235 @@ def _zip_distance_miles(zip1: str, zip2: str) -> Optional[float]:
         a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
         return R * 2 * atan2(sqrt(a), sqrt(1-a))
     except Exception as exc:
-        logger.debug(f"Zip distance calc failed: {exc}")
+        logger.debug("Zip distance calc failed: %s", exc)
         return None
 
 API_URL  = "https://api.st-prd-1.aws.storagetreasures.com/p/auctions"
 SITE_URL = "https://www.storagetreasures.com"
+PAGE_SIZE = 15  # auctions per API page
+PAGE_FETCH_CONCURRENCY = int(os.getenv("PAGE_FETCH_CONCURRENCY", "3"))  # pages 2+ in flight
 
-IMAGE_DIR = Path(__file__).parent.parent.parent / "data" / "images"
+DATA_DIR  = Path(__file__).parent.parent.parent / "data"
+IMAGE_DIR = DATA_DIR / "images"
 IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+IMAGE_DOWNLOAD_CONCURRENCY = 8  # simultaneous image requests per listing
 
+# Browser cookies/localStorage from the last scrape, reused while fresh so
+# the site doesn't have to set up a new session each time
+SESSION_STATE_FILE = DATA_DIR / "st_state.json"
+SESSION_TTL        = 24 * 3600  # seconds
 
-def _rand(n: int = 12) -> str:
-    return "".join(random.choices(string.ascii_lowercase + string.digits, k=n))
+# API request headers captured by the last browser scrape; while fresh,
+# page 1 is requested with these over httpx and Chromium isn't started
+HEADERS_FILE = DATA_DIR / "st_headers.json"
+HEADERS_TTL  = 6 * 3600  # seconds
+
+
+# randStr only has to differ between requests (it defeats caching), so a
+# counter seeded from the clock does; no RNG needed
+_RAND_SEQ = itertools.count(time.time_ns())
+
+
+def _rand() -> str:
+    return f"{next(_RAND_SEQ):x}"
+
+
+def _fresh_file(path: Path, ttl: float = SESSION_TTL) -> Optional[Path]:
+    """Return path if it exists and was written less than ttl seconds ago."""
+    try:
+        if time.time() - path.stat().st_mtime < ttl:
+            return path
+    except OSError:
+        pass
+    return None
+
+
+def _image_ext(content_type: Optional[str], url: str) -> str:
+    """File extension for a downloaded image: from its Content-Type, else the URL."""
+    if content_type:
+        ext = mimetypes.guess_extension(content_type.split(";")[0].strip())
+        if ext:
+            return ext
+    return "." + url.rsplit(".", 1)[-1].split("?")[0][:4]
+
+
+# Resource types the search page loads that the scraper never needs
+_BLOCKED_RESOURCES = frozenset({"image", "font", "stylesheet", "media"})
+
+
+async def _block_assets(route) -> None:
+    """Playwright route handler: abort asset requests, let the rest through."""
+    if route.request.resource_type in _BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def _load_headers() -> Optional[dict]:
+    """Cached API request headers, or None if missing, stale or unreadable."""
+    path = _fresh_file(HEADERS_FILE, HEADERS_TTL)
+    if path is None:
+        return None
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_headers(headers: dict) -> None:
+    try:
+        HEADERS_FILE.write_bytes(orjson.dumps(headers))
+    except OSError as exc:
+        logger.warning("Could not cache API headers: %s", exc)
+
+
+def _page_params(
+    page_num:     int,
+    state:        Optional[str],
+    zip_code:     Optional[str],
+    filter_types: str,
+) -> dict:
+    """Query parameters for one page of the auctions API."""
+    params: dict = {
+        "page_num":          page_num,
+        "page_count":        PAGE_SIZE,
+        "search_type":       "state" if state else "zipcode",
+        "search_term":       state   if state else (zip_code or ""),
+        "filter_types":      filter_types,
+        "filter_categories": "",
+        "filter_unit_contents": "",
+        "sort_column":       "expire_date",
+        "sort_direction":    "asc",
+        "filter_public_notice": "",
+        "randStr":           _rand(),
+    }
+    if state:
+        params["search_state"] = state
+    return params
+
+
+# API numeric auction type → Listing.auction_type
+_TYPE_MAP = {1: "lien", 2: "private", 3: "manager_special", 4: "charity"}
+
+
+class NormalizedAuction(NamedTuple):
+    """
+    One API auction parsed into Listing column values, plus its thumbnail.
+    Every field before thumb is a Listing column (see _LISTING_FIELDS).
+    """
+    external_id:      str
+    url:              str
+    facility_name:    Optional[str]
+    facility_address: Optional[str]
+    city:             Optional[str]
+    state:            Optional[str]
+    zip_code:         Optional[str]
+    unit_number:      str
+    unit_size:        Optional[str]
+    unit_size_sqft:   Optional[float]
+    description:      Optional[str]
+    auction_end_time: Optional[datetime]
+    auction_type:     Optional[str]
+    current_bid:      Optional[float]
+    bid_count:        int
+    thumb:            Optional[str]
+
+
+_LISTING_FIELDS = NormalizedAuction._fields[:-1]
+
+
+def _listing_row(n: NormalizedAuction) -> dict:
+    """Listing insert mapping for n (zip stops before thumb)."""
+    return dict(zip(_LISTING_FIELDS, n))
+
+
+def _normalize(a: dict, now: datetime) -> Optional[NormalizedAuction]:
+    """
+    Parse one API auction in a single pass; no DB access.
+
+    Returns None for auctions without an id and for auctions that ended
+    before now.  Nested objects are looked up once each.
+    """
+    external_id = str(a.get("auction_id", "")).strip()
+    if not external_id:
+        return None
+
+    # ── Dates ──────────────────────────────────────────────────────
+    expire_utc = ((a.get("expire_date") or {}).get("utc") or {}).get("datetime")
+    end_time: Optional[datetime] = None
+    if expire_utc:
+        try:
+            end_time = datetime.fromisoformat(expire_utc)  # "YYYY-MM-DD HH:MM:SS"
+        except ValueError:
+            pass
+        else:
+            # Listings store naive UTC; an offset would make the compare below raise
+            if end_time.tzinfo is not None:
+                end_time = end_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+    # ── Skip ended auctions ───────────────────────────────────────
+    if end_time and end_time < now:
+        return None
+
+    # ── Money ─────────────────────────────────────────────────────
+    bid_raw = a.get("current_bid")
+    current_bid: Optional[float] = (
+        float(bid_raw["amount"])
+        if isinstance(bid_raw, dict) and bid_raw.get("amount") is not None
+        else None
+    )
+
+    # ── Build listing URL ─────────────────────────────────────────
+    state = a.get("state")
+    city  = a.get("city")
+    state_slug = (state or "").lower()
+    city_slug  = (city  or "").lower().replace(" ", "-")
+    url = f"{SITE_URL}/auctions/{state_slug}/{city_slug}/{external_id}"
+
+    # ── Description ───────────────────────────────────────────────
+    description = "\n\n".join(
+        filter(None, [a.get("unit_contents"), a.get("unit_additional")])
+    ) or None
+
+    # ── Unit size ─────────────────────────────────────────────────
+    unit_size_sqft: Optional[float] = None
+    vol = a.get("unit_volume")
+    if vol:
+        try:
+            unit_size_sqft = float(vol)
+        except (ValueError, TypeError):
+            pass
+
+    # ── Facility ──────────────────────────────────────────────────
+    facility = a.get("facility") or {}
+    facility_name    = a.get("facility_name") or facility.get("facility_name") or None
+    facility_address = a.get("address")       or facility.get("address")       or None
+
+    # ── Auction type ───────────────────────────────────────────
+    raw_type = a.get("type") or a.get("auction_type_id") or a.get("auction_type")
+    try:
+        auction_type = _TYPE_MAP.get(int(raw_type)) if raw_type is not None else None
+    except (ValueError, TypeError):
+        auction_type = str(raw_type).lower() if raw_type else None
+
+    return NormalizedAuction(
+        external_id      = external_id,
+        url              = url,
+        facility_name    = facility_name,
+        facility_address = facility_address,
+        city             = city,
+        state            = state,
+        zip_code         = a.get("zipcode"),
+        unit_number      = str(a.get("unit_number") or ""),
+        unit_size        = a.get("unit_size"),
+        unit_size_sqft   = unit_size_sqft,
+        description      = description,
+        auction_end_time = end_time,
+        auction_type     = auction_type,
+        current_bid      = current_bid,
+        bid_count        = int(a.get("total_bids") or 0),
+        thumb            = (a.get("image") or {}).get("image_path"),
+    )
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -102,11 +329,50 @@ class StorageTreasuresScraper:
         scraper = StorageTreasuresScraper()
         count = scraper.fetch_and_save(state="FL", max_pages=2)
         print(f"{count} new listings saved")
+        scraper.close()
+
+    Repeated calls on one scraper share a single event loop and, when
+    page 1 needs the browser, a single Chromium; close() shuts both down.
     """
 
     def __init__(self, headless: bool = True, delay: float = 1.5):
         self.headless = headless
-        self.delay    = delay         # seconds between paginated httpx requests
+        self.delay    = delay         # max random delay (s) before each paginated httpx request
+        self._runner: Optional[asyncio.Runner] = None  # event loop shared by the sync wrappers
+        # Playwright driver and Chromium: started by the first scrape that
+        # needs a browser, kept on self._runner's loop until close()
+        self._playwright = None
+        self._browser    = None
+
+    def _run(self, coro):
+        """Run coro on this scraper's event loop, created on first use."""
+        if self._runner is None:
+            self._runner = asyncio.Runner()
+        return self._runner.run(coro)
+
+    def close(self) -> None:
+        """Shut down the browser and event loop, if they were started."""
+        if self._runner is not None:
+            self._runner.run(self._close_browser())
+            self._runner.close()
+            self._runner = None
+
+    async def _get_browser(self):
+        """This scraper's Chromium instance, launched on first use."""
+        if self._browser is None or not self._browser.is_connected():
+            from playwright.async_api import async_playwright
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        return self._browser
+
+    async def _close_browser(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
 
     # ------------------------------------------------------------------
     # Sync wrapper (runs the async implementation)
@@ -120,10 +386,15 @@ class StorageTreasuresScraper:
         filter_types: str           = "1,2,3,4",
         db:           Optional[Session] = None,
     ) -> tuple:
-        """Fetch listings and upsert to DB.  Returns (new_count, total_fetched)."""
-        return asyncio.run(
-            self._fetch_and_save_async(state, zip_code, radius_miles, max_pages, filter_types, db)
-        )
+        """
+        Fetch listings and upsert to DB.  Returns (new_count, total_fetched).
+
+        Commits only when it opens its own session; with a passed-in db the
+        writes join its transaction and the caller commits.
+        """
+        return self._run(self._fetch_and_save_async(
+            state, zip_code, radius_miles, max_pages, filter_types, db
+        ))
 
     # ------------------------------------------------------------------
     # Internal async implementation
@@ -137,8 +408,11 @@ class StorageTreasuresScraper:
         filter_types: str,
         db:           Optional[Session],
     ) -> tuple:
-        logger.info(f"Scrape params: state={state} zip={zip_code} radius={radius_miles} max_pages={max_pages}")
-        # Pre-fetch origin coords once so _upsert doesn't make repeated API calls
+        logger.info(
+            "Scrape params: state=%s zip=%s radius=%s max_pages=%s",
+            state, zip_code, radius_miles, max_pages,
+        )
+        # Pre-fetch origin coords once so later lookups hit the cache
         if zip_code:
             _get_zip_coords(zip_code)
         close_db = db is None
@@ -146,12 +420,11 @@ class StorageTreasuresScraper:
             db = SessionLocal()
         try:
             auctions = await self._fetch_all_pages(state, zip_code, radius_miles, max_pages, filter_types)
-            new_count = 0
-            for a in auctions:
-                if self._upsert(a, db, zip_code=zip_code, radius_miles=radius_miles):
-                    new_count += 1
-            db.commit()
-            logger.info(f"Scrape complete: {new_count} new / {len(auctions)} total fetched")
+            new_count = self._save(auctions, db)
+            # A caller-supplied session owns the transaction
+            if close_db:
+                db.commit()
+            logger.info("Scrape complete: %d new / %d total fetched", new_count, len(auctions))
             return new_count, len(auctions)
         finally:
             if close_db:
@@ -167,45 +440,141 @@ class StorageTreasuresScraper:
     ) -> List[dict]:
         """
         Fetch up to max_pages of results.
-        Page 1 via Playwright (auth handled automatically).
-        Pages 2+ via httpx with captured headers.
+        Page 1 via httpx with headers cached from an earlier scrape, or via
+        Playwright (auth handled automatically) when there are none or they
+        no longer work.  Pages 2+ via httpx with the same headers.
         """
-        from playwright.async_api import async_playwright
-
-        page1_auctions: List[dict] = []
-        captured_headers: dict     = {}
-        total_records: int         = 0
-
-        # ── PLAYWRIGHT: page 1 ────────────────────────────────────────
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(headless=self.headless)
-            ctx = await browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/122.0.0.0 Safari/537.36"
+        params_list = [
+            _page_params(page_num, state, zip_code, filter_types)
+            for page_num in range(1, max_pages + 1)
+        ]
+
+        # One HTTP/2 connection to the API host carries page 1 and all of
+        # pages 2+ as concurrent streams
+        async with httpx.AsyncClient(
+            http2   = True,
+            timeout = httpx.Timeout(20.0, connect=5.0),
+            limits  = httpx.Limits(max_keepalive_connections=10, keepalive_expiry=30),
+        ) as client:
+            # ── Page 1: cached headers, else Playwright ────────────────
+            page1_body, captured_headers = await self._try_httpx_page1(client, params_list[0])
+            if not page1_body:
+                page1_body, captured_headers = await self._fetch_page1_browser(
+                    state, zip_code, radius_miles
                 )
+                if page1_body.get("auctions") and captured_headers:
+                    _save_headers(captured_headers)
+
+            page1_auctions = page1_body.get("auctions") or []
+            total_records  = int(page1_body.get("total_records", 0))
+            logger.info(
+                "Page 1: %d auctions  (total_records=%d)", len(page1_auctions), total_records
+            )
+
+            all_auctions = list(page1_auctions)
+
+            if max_pages <= 1 or not captured_headers:
+                return all_auctions
+
+            # ── HTTPX: pages 2 .. max_pages, a few at a time ──────────
+            if not all_auctions:
+                return all_auctions  # nothing on page 1 → no more pages
+
+            # Stop at the last page total_records says exists, rather than
+            # requesting one past it to find it empty
+            last_page = math.ceil(total_records / PAGE_SIZE) if total_records else max_pages
+            sem = asyncio.Semaphore(PAGE_FETCH_CONCURRENCY)  # polite cap on the API
+            results = await asyncio.gather(
+                *(self._fetch_page(client, sem, captured_headers, p)
+                  for p in params_list[1:last_page]),
+                return_exceptions=True,
             )
+
+        # Results come back in page order; keep pages up to the first
+        # empty or failed one, as the sequential loop did.
+        for page_num, result in enumerate(results, start=2):
+            if isinstance(result, httpx.HTTPStatusError):
+                logger.warning(
+                    "Page %d returned %d — stopping pagination",
+                    page_num, result.response.status_code,
+                )
+                break
+            if isinstance(result, Exception):
+                logger.error("Page %d error: %s", page_num, result)
+                break
+            page_aus = result.get("auctions") or []
+            logger.info("Page %d: %d auctions", page_num, len(page_aus))
+            all_auctions.extend(page_aus)
+            if not page_aus:
+                break
+
+        return all_auctions
+
+    async def _try_httpx_page1(self, client: httpx.AsyncClient, params: dict) -> tuple:
+        """
+        Fetch page 1 with the cached headers, skipping the browser.
+
+        Returns (body, headers), or ({}, {}) when there are no fresh cached
+        headers or the API rejects them (typically 403 once they expire).
+        """
+        headers = _load_headers()
+        if not headers:
+            return {}, {}
+        try:
+            resp = await client.get(API_URL, headers=headers, params=params)
+            resp.raise_for_status()
+            body = orjson.loads(resp.content)
+        except Exception as exc:
+            logger.info("Cached headers rejected (%s) — falling back to Playwright", exc)
+            return {}, {}
+        if not body.get("auctions"):
+            return {}, {}
+        return body, headers
+
+    async def _fetch_page1_browser(
+        self,
+        state:        Optional[str],
+        zip_code:     Optional[str],
+        radius_miles: int,
+    ) -> tuple:
+        """Load the search page in Playwright; returns (page-1 body, API request headers)."""
+        captured_headers: dict = {}
+        page1_body: dict       = {}
+
+        # Fresh context per scrape (seeded from the saved session state) on
+        # the scraper's long-lived browser
+        browser = await self._get_browser()
+        ctx = await browser.new_context(
+            user_agent=(
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/122.0.0.0 Safari/537.36"
+            ),
+            storage_state=_fresh_file(SESSION_STATE_FILE),
+        )
+        try:
+            # Only the API XHR matters; don't download the page's assets
+            await ctx.route("**/*", _block_assets)
             page = await ctx.new_page()
+            got_page1 = asyncio.Event()
 
             # Capture request headers so we can replay them with httpx
             def on_request(req: object) -> None:
                 if API_URL in req.url and "upcoming" not in req.url:
                     captured_headers.update(req.headers)
 
-            page1_body: dict = {}
-
             async def on_response(resp: object) -> None:
                 nonlocal page1_body
                 url: str = resp.url
                 if API_URL in url and "upcoming" not in url:
                     try:
-                        body = await resp.json()
+                        body = orjson.loads(await resp.body())
                         # Use the response that actually contains state-filtered data
                         if body.get("auctions") and not page1_body.get("auctions"):
                             page1_body = body
+                            got_page1.set()
                     except Exception as exc:
-                        logger.debug(f"Response parse error: {exc}")
+                        logger.debug("Response parse error: %s", exc)
 
             page.on("request",  on_request)
             page.on("response", on_response)
@@ -216,208 +585,148 @@ class StorageTreasuresScraper:
             elif zip_code:
                 search_url += f"?type=zipcode&radius={radius_miles}&search_term={zip_code}"
 
-            logger.info(f"Playwright → {search_url}")
-            await page.goto(search_url, wait_until="networkidle", timeout=45000)
-            await browser.close()
-
-        page1_auctions = page1_body.get("auctions") or []
-        total_records  = int(page1_body.get("total_records", 0))
-        logger.info(
-            f"Page 1: {len(page1_auctions)} auctions  "
-            f"(total_records={total_records})"
-        )
+            logger.info("Playwright → %s", search_url)
+            await page.goto(search_url, wait_until="domcontentloaded", timeout=45000)
+            # Done as soon as the results XHR arrives, not at network idle
+            try:
+                await asyncio.wait_for(got_page1.wait(), timeout=30)
+            except TimeoutError:
+                logger.warning("No auction results from the search page within 30s")
+            await ctx.storage_state(path=SESSION_STATE_FILE)
+        finally:
+            await ctx.close()
 
-        all_auctions = list(page1_auctions)
-
-        if max_pages <= 1 or not captured_headers:
-            return all_auctions
-
-        # ── HTTPX: pages 2 .. max_pages ───────────────────────────────
-        search_type = "state"   if state    else "zipcode"
-        search_term = state     if state    else (zip_code or "")
-
-        with httpx.Client(timeout=20) as client:
-            for page_num in range(2, max_pages + 1):
-                if not all_auctions and page_num > 1:
-                    break  # nothing on previous page → stop
-
-                time.sleep(self.delay)
-
-                params: dict = {
-                    "page_num":          page_num,
-                    "page_count":        15,
-                    "search_type":       search_type,
-                    "search_term":       search_term,
-                    "filter_types":      filter_types,
-                    "filter_categories": "",
-                    "filter_unit_contents": "",
-                    "sort_column":       "expire_date",
-                    "sort_direction":    "asc",
-                    "filter_public_notice": "",
-                    "randStr":           _rand(),
-                }
-                if state:
-                    params["search_state"] = state
-
-                try:
-                    resp = client.get(API_URL, headers=captured_headers, params=params)
-                    resp.raise_for_status()
-                    data     = resp.json()
-                    page_aus = data.get("auctions") or []
-                    logger.info(f"Page {page_num}: {len(page_aus)} auctions")
-                    all_auctions.extend(page_aus)
-                    if not page_aus:
-                        break
-                except httpx.HTTPStatusError as exc:
-                    logger.warning(
-                        f"Page {page_num} returned {exc.response.status_code} "
-                        f"— stopping pagination"
-                    )
-                    break
-                except Exception as exc:
-                    logger.error(f"Page {page_num} error: {exc}")
-                    break
+        return page1_body, captured_headers
 
-        return all_auctions
+    async def _fetch_page(
+        self,
+        client:  httpx.AsyncClient,
+        sem:     asyncio.Semaphore,
+        headers: dict,
+        params:  dict,
+    ) -> dict:
+        """
+        GET one results page after a random politeness delay (up to
+        self.delay).  The delay is taken inside sem, so it spaces out the
+        requests of each slot rather than all pages waiting at once.
+        """
+        async with sem:
+            await asyncio.sleep(random.uniform(0, self.delay))
+            resp = await client.get(API_URL, headers=headers, params=params)
+            resp.raise_for_status()
+        return orjson.loads(resp.content)
 
     # ------------------------------------------------------------------
     # DB upsert
     # ------------------------------------------------------------------
-    def _upsert(self, a: dict, db: Session, zip_code: Optional[str] = None, radius_miles: int = 50) -> bool:
-        """Insert or update one auction.  Returns True if NEW row was created."""
-        external_id = str(a.get("auction_id", "")).strip()
-        if not external_id:
-            return False
-
-        # ── Dates ──────────────────────────────────────────────────────
-        expire_utc = (
-            a.get("expire_date", {})
-             .get("utc", {})
-             .get("datetime")
-        )
-        end_time: Optional[datetime] = None
-        if expire_utc:
-            try:
-                end_time = datetime.strptime(expire_utc, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                pass
-
-        # ── Money ─────────────────────────────────────────────────────
-        bid_raw = a.get("current_bid", {})
-        current_bid: Optional[float] = (
-            float(bid_raw["amount"])
-            if isinstance(bid_raw, dict) and bid_raw.get("amount") is not None
-            else None
-        )
-
-        # ── Skip ended auctions ───────────────────────────────────────
-        if end_time and end_time < datetime.utcnow():
-            return False
-
-        # ── Existing → update only live fields ────────────────────────
-        existing = (
-            db.query(Listing)
-            .filter(Listing.external_id == external_id)
-            .first()
-        )
-        if existing:
-            existing.current_bid = current_bid
-            existing.bid_count   = int(a.get("total_bids") or 0)
-            return False
-
-        # ── Build listing URL ─────────────────────────────────────────
-        state_slug = (a.get("state") or "").lower()
-        city_slug  = (a.get("city")  or "").lower().replace(" ", "-")
-        url = f"{SITE_URL}/auctions/{state_slug}/{city_slug}/{external_id}"
-
-        # ── Description ───────────────────────────────────────────────
-        description = "\n\n".join(
-            filter(None, [a.get("unit_contents"), a.get("unit_additional")])
-        ) or None
-
-        # ── Unit size ─────────────────────────────────────────────────
-        unit_size_sqft: Optional[float] = None
-        vol = a.get("unit_volume")
-        if vol:
-            try:
-                unit_size_sqft = float(vol)
-            except (ValueError, TypeError):
-                pass
-
-        # ── Facility ──────────────────────────────────────────────────
-        facility = a.get("facility") or {}
-        facility_name = (
-            a.get("facility_name")
-            or facility.get("facility_name")
-            or None
-        )
-        facility_address = (
-            a.get("address")
-            or facility.get("address")
-            or None
-        )
-
-        # ── Auction type ───────────────────────────────────────────
-        _TYPE_MAP = {1: "lien", 2: "private", 3: "manager_special", 4: "charity"}
-        raw_type = a.get("type") or a.get("auction_type_id") or a.get("auction_type")
-        try:
-            auction_type = _TYPE_MAP.get(int(raw_type)) if raw_type is not None else None
-        except (ValueError, TypeError):
-            auction_type = str(raw_type).lower() if raw_type else None
-
-        listing = Listing(
-            external_id      = external_id,
-            url              = url,
-            facility_name    = facility_name,
-            facility_address = facility_address,
-            city             = a.get("city"),
-            state            = a.get("state"),
-            zip_code         = a.get("zipcode"),
-            unit_number      = str(a.get("unit_number") or ""),
-            unit_size        = a.get("unit_size"),
-            unit_size_sqft   = unit_size_sqft,
-            description      = description,
-            auction_end_time = end_time,
-            auction_type     = auction_type,
-            current_bid      = current_bid,
-            bid_count        = int(a.get("total_bids") or 0),
-        )
-        db.add(listing)
-        db.flush()  # populate listing.id before adding images
-
-        # ── Image ─────────────────────────────────────────────────────
-        img = a.get("image") or {}
-        thumb = img.get("image_path")
-        if thumb:
-            db.add(ListingImage(
-                listing_id  = listing.id,
-                url         = thumb,
-                order_index = 0,
-            ))
-
-        return True
+    def _save(self, auctions: List[dict], db: Session) -> int:
+        """
+        Upsert new and changed auctions into listings in one statement,
+        then add the thumbnails of newly created listings in one more.
+        Existing listings only get their live fields (bid, bid count)
+        refreshed.  Returns the number of new listings.
+        """
+        now = utc_now()
+        parsed: dict = {}   # external_id → NormalizedAuction
+        for a in auctions:
+            n = _normalize(a, now)
+            if n is None:
+                continue
+            seen = parsed.get(n.external_id)
+            if seen is not None:
+                # Repeated across pages: the later copy has the fresher bid
+                n = seen._replace(current_bid=n.current_bid, bid_count=n.bid_count)
+            parsed[n.external_id] = n
+        if not parsed:
+            return 0
+
+        # One IN query for the live fields of listings we already have;
+        # those whose bid and bid count are unchanged need no write at all.
+        existing = {
+            ext: (current_bid, bid_count)
+            for ext, current_bid, bid_count in db.execute(
+                select(Listing.external_id, Listing.current_bid, Listing.bid_count)
+                .where(Listing.external_id.in_(parsed))
+            )
+        }
+        changed = [
+            _listing_row(n) for ext, n in parsed.items()
+            if existing.get(ext) != (n.current_bid, n.bid_count)
+        ]
+        if not changed:
+            return 0
+
+        stmt = sqlite_insert(Listing)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Listing.external_id],
+            set_={
+                "current_bid": stmt.excluded.current_bid,
+                "bid_count":   stmt.excluded.bid_count,
+                "updated_at":  now,
+            },
+        ).returning(Listing.id, Listing.external_id)
+        new_ids = {
+            ext: listing_id
+            for listing_id, ext in db.execute(stmt, changed)
+            if ext not in existing
+        }
+
+        images = [
+            {"listing_id": listing_id, "url": parsed[ext].thumb, "order_index": 0}
+            for ext, listing_id in new_ids.items()
+            if parsed[ext].thumb
+        ]
+        if images:
+            db.execute(insert(ListingImage), images)
+        return len(new_ids)
 
     # ------------------------------------------------------------------
     # Image download (optional post-scrape step)
     # ------------------------------------------------------------------
     def download_images(self, listing: Listing, db: Session) -> int:
         """Download listing photos to data/images/.  Returns count downloaded."""
-        count = 0
-        with httpx.Client(timeout=30) as client:
-            for img in listing.images:
-                if img.local_path:
-                    continue
-                try:
-                    r   = client.get(img.url)
-                    r.raise_for_status()
-                    ext  = img.url.rsplit(".", 1)[-1].split("?")[0][:4]
-                    path = IMAGE_DIR / f"{listing.external_id}_{img.order_index}.{ext}"
-                    path.write_bytes(r.content)
-                    img.local_path    = str(path)
-                    img.downloaded_at = datetime.utcnow()
-                    count += 1
-                    time.sleep(0.3)
-                except Exception as exc:
-                    logger.warning(f"Image download failed ({img.url}): {exc}")
+        return self._run(self._download_images_async(listing, db))
+
+    async def _download_images_async(self, listing: Listing, db: Session) -> int:
+        """Fetch all not-yet-downloaded images concurrently over one pooled client."""
+        pending = [img for img in listing.images if not img.local_path]
+        sem = asyncio.Semaphore(IMAGE_DOWNLOAD_CONCURRENCY)  # polite cap on the CDN
+        limits = httpx.Limits(max_keepalive_connections=20)
+        async with httpx.AsyncClient(http2=True, timeout=30, limits=limits) as client:
+            done = await asyncio.gather(*(
+                self._download_image(client, sem, listing, img) for img in pending
+            ))
         db.commit()
-        return count
+        return sum(done)
+
+    async def _download_image(
+        self,
+        client:  httpx.AsyncClient,
+        sem:     asyncio.Semaphore,
+        listing: Listing,
+        img:     ListingImage,
+    ) -> bool:
+        """Download one image and record its local path.  Returns True on success."""
+        async with sem:
+            tmp: Optional[Path] = None
+            try:
+                # Streamed to a temp file in chunks, then renamed into place:
+                # the image is never held whole in memory and readers never
+                # see a partial file.
+                async with client.stream("GET", img.url) as r:
+                    r.raise_for_status()
+                    ext  = _image_ext(r.headers.get("content-type"), img.url)
+                    path = IMAGE_DIR / f"{listing.external_id}_{img.order_index}{ext}"
+                    tmp  = path.with_name(path.name + ".tmp")
+                    async with aiofiles.open(tmp, "wb") as f:
+                        async for chunk in r.aiter_bytes(64 * 1024):
+                            await f.write(chunk)
+                os.replace(tmp, path)
+            except Exception as exc:
+                logger.warning("Image download failed (%s): %s", img.url, exc)
+                if tmp is not None:
+                    tmp.unlink(missing_ok=True)
+                return False
+        img.local_path    = str(path)
+        img.downloaded_at = utc_now()
+        return True
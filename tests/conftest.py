@@ -0,0 +1,45 @@
+"""
+Shared fixtures: point the app's engines and sessions at a throwaway SQLite file.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import database
+
+
+@pytest.fixture
+def bind_db(tmp_path, monkeypatch):
+    """
+    Rebind app.database to tmp_path/test.db and return the file's path.
+    Nothing is created; call database.init_db() (or build an older schema first).
+    """
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", database._sqlite_pragmas)
+    # NullPool: TestClient runs each request's loop in its own thread
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    event.listen(async_engine.sync_engine, "connect", database._sqlite_pragmas)
+
+    # The session factories are imported by name elsewhere, so rebind them in place
+    real_engine, real_async_engine = database.engine, database.async_engine
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "async_engine", async_engine)
+    database.SessionLocal.configure(bind=engine)
+    database.AsyncSessionLocal.configure(bind=async_engine)
+    yield path
+    database.SessionLocal.configure(bind=real_engine)
+    database.AsyncSessionLocal.configure(bind=real_async_engine)
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def db(bind_db):
+    """A sync session on a freshly initialized test DB."""
+    database.init_db()
+    with database.SessionLocal() as session:
+        yield session
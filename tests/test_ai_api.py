@@ -0,0 +1,120 @@
+"""
+POST /api/ai/recommend-all: bulk scoring, the unchanged-input skip and the
+insert/update split of the write.
+"""
+from datetime import timedelta
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.api import ai
+from app.models import AIRecommendation, Listing, ListingImage, utc_now
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(ai.router, prefix="/api/ai")
+    with TestClient(app) as c:
+        yield c
+
+
+def _add_listings(db, count: int, start: int = 1) -> list:
+    """Add count active listings (3 days left) and return their ids."""
+    listings = [
+        Listing(
+            external_id      = str(i),
+            url              = f"https://example.test/{i}",
+            unit_size        = "10x10",
+            unit_size_sqft   = 100.0,
+            current_bid      = 50.0,
+            bid_count        = i,
+            auction_end_time = utc_now() + timedelta(days=3),
+            description      = "tools and boxes",
+        )
+        for i in range(start, start + count)
+    ]
+    db.add_all(listings)
+    db.commit()
+    return [l.id for l in listings]
+
+
+def _recs(db) -> dict:
+    """listing_id → (recommendation id, reasoning labels)."""
+    db.expire_all()
+    return {
+        rec.listing_id: (rec.id, [f["label"] for f in orjson.loads(rec.reasoning)])
+        for rec in db.scalars(select(AIRecommendation))
+    }
+
+
+def _run(client, **params) -> dict:
+    return client.post("/api/ai/recommend-all", params=params).json()
+
+
+def test_second_run_skips_unchanged_listings(client, db):
+    _add_listings(db, 5)
+
+    assert _run(client) == {"created": 5, "updated": 0, "unchanged": 0, "skipped": 0, "total": 5}
+    assert _run(client) == {"created": 0, "updated": 0, "unchanged": 5, "skipped": 0, "total": 5}
+
+
+def test_changed_listings_are_updated_in_place_and_new_ones_inserted(client, db):
+    first, second, *_ = _add_listings(db, 4)
+    _run(client)
+    before = _recs(db)
+
+    db.get(Listing, first).current_bid = 250.0
+    _add_listings(db, 1, start=10)
+
+    assert _run(client) == {"created": 1, "updated": 1, "unchanged": 3, "skipped": 0, "total": 5}
+    after = _recs(db)
+    assert after[first][0] == before[first][0]
+    assert "Bid $200–400 ($250)" in after[first][1]
+    assert after[second] == before[second]
+    assert len(after) == 5
+
+
+def test_listings_are_scored_in_chunks(client, db, monkeypatch):
+    chunk_sizes = []
+    score_chunk = ai._score_chunk
+
+    def spy(listings, *args):
+        chunk_sizes.append(len(listings))
+        return score_chunk(listings, *args)
+
+    monkeypatch.setattr(ai, "SCORE_CHUNK_SIZE", 2)
+    monkeypatch.setattr(ai, "_score_chunk", spy)
+    _add_listings(db, 5)
+
+    assert _run(client)["created"] == 5
+    assert sorted(chunk_sizes) == [1, 2, 2]
+    assert len(_recs(db)) == 5
+
+
+def test_vision_signals_are_scored_and_part_of_the_input_hash(client, db, monkeypatch):
+    with_image, without_image = _add_listings(db, 2)
+    db.add(ListingImage(listing_id=with_image, url="https://img.test/a.jpg", order_index=0))
+    db.commit()
+
+    signals = {"tools": True}
+    batches = []
+
+    async def fake_batch(image_url_lists):
+        batches.append(image_url_lists)
+        return [dict(signals) for _ in image_url_lists]
+
+    monkeypatch.setattr(ai, "analyze_listing_images_batch", fake_batch)
+
+    assert _run(client, use_vision=True)["created"] == 2
+    assert batches == [[["https://img.test/a.jpg"]]]
+    recs = _recs(db)
+    assert "Photo: tools / contractor unit" in recs[with_image][1]
+    assert "Photo: tools / contractor unit" not in recs[without_image][1]
+
+    assert _run(client, use_vision=True)["unchanged"] == 2
+    signals["water_damage"] = True
+    assert _run(client, use_vision=True)["updated"] == 1
@@ -0,0 +1,137 @@
+"""
+Batch vision analysis: one download per URL, one Claude call per distinct
+image, and the caches that let a repeat batch skip both.
+"""
+import asyncio
+import base64
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app import database
+from app.ai import image_analyzer
+from app.models import VisionCache, utc_now
+
+SIGNALS = {"tools": True, "organization_level": "neat"}
+
+# URL → image bytes; dup.jpg is the same photo as a.jpg under another URL
+IMAGES = {
+    "https://img.test/a.jpg":   b"\xff\xd8 photo a",
+    "https://img.test/b.jpg":   b"\xff\xd8 photo b",
+    "https://img.test/dup.jpg": b"\xff\xd8 photo a",
+}
+
+
+class FakeVision:
+    """Stands in for AsyncAnthropic: records each image sent, answers SIGNALS."""
+
+    def __init__(self):
+        self.messages = self
+        self.images: list = []
+
+    async def create(self, **kwargs):
+        source = kwargs["messages"][0]["content"][0]["source"]
+        self.images.append(base64.b64decode(source["data"]))
+        return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(SIGNALS))])
+
+
+@pytest.fixture
+def vision(bind_db, monkeypatch):
+    database.init_db()
+    fake = FakeVision()
+    monkeypatch.setattr(image_analyzer, "_ANTHROPIC_CLIENT", fake)
+    monkeypatch.setattr(image_analyzer, "_URL_SHA_CACHE", {})
+    return fake
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Serve IMAGES through a mock transport; returns the URLs requested, in order."""
+    requested: list = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        body = IMAGES.get(str(request.url))
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=body, headers={"content-type": "image/jpeg"})
+
+    class MockClient(httpx.AsyncClient):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(handler)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(image_analyzer.httpx, "AsyncClient", MockClient)
+    return requested
+
+
+def _analyze(image_url_lists: list) -> list:
+    return asyncio.run(image_analyzer.analyze_listing_images_batch(image_url_lists))
+
+
+def test_each_distinct_image_is_analyzed_once(vision, downloads):
+    a, b, dup = IMAGES
+    results = _analyze([[a], [b], [a, b], [dup], []])
+
+    assert results == [SIGNALS, SIGNALS, SIGNALS, SIGNALS, None]
+    assert sorted(downloads) == sorted([a, b, dup])
+    assert sorted(vision.images) == sorted({IMAGES[a], IMAGES[b]})
+
+
+def test_repeat_batch_skips_download_and_analysis(vision, downloads):
+    a, b, _ = IMAGES
+    _analyze([[a], [b]])
+    downloads.clear()
+    vision.images.clear()
+
+    assert _analyze([[b], [a]]) == [SIGNALS, SIGNALS]
+    assert downloads == []
+    assert vision.images == []
+
+
+def test_cached_result_is_found_by_image_hash(vision, downloads):
+    a, _, dup = IMAGES
+    _analyze([[a]])
+    image_analyzer._URL_SHA_CACHE.clear()
+    vision.images.clear()
+
+    # Downloaded again (URLs unknown), but the bytes hash to a cached result
+    assert _analyze([[a], [dup]]) == [SIGNALS, SIGNALS]
+    assert vision.images == []
+
+
+def test_failed_download_gives_none(vision, downloads):
+    assert _analyze([["https://img.test/missing.jpg"]]) == [None]
+    assert vision.images == []
+
+
+def test_urls_are_worked_through_in_bounded_rounds(vision, downloads, monkeypatch):
+    monkeypatch.setattr(image_analyzer, "VISION_BATCH_SIZE", 2)
+    a, b, dup = IMAGES
+
+    assert _analyze([[a], [b], [dup], [a]]) == [SIGNALS] * 4
+    assert sorted(downloads) == sorted([a, b, dup])
+    assert len(vision.images) == 2
+
+
+def _age_cache(days: int) -> None:
+    with database.SessionLocal() as db:
+        db.query(VisionCache).update({VisionCache.created_at: utc_now() - timedelta(days=days)})
+        db.commit()
+
+
+def test_expired_cache_entries_are_ignored_and_purged(vision, downloads):
+    a, _, _ = IMAGES
+    _analyze([[a]])
+    _age_cache(days=31)
+    vision.images.clear()
+
+    assert _analyze([[a]]) == [SIGNALS]
+    assert vision.images == [IMAGES[a]]
+    assert image_analyzer.purge_vision_cache() == 0  # re-analysis refreshed the entry
+
+    _age_cache(days=31)
+    assert image_analyzer.purge_vision_cache() == 1
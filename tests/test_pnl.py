@@ -0,0 +1,187 @@
+"""
+P&L totals maintained by the database: the generated total_cost column and
+the net_profit triggers, on a fresh DB and on one migrated from the original
+schema, through every API path that changes costs or revenue.
+"""
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import database
+from app.api import pnl
+
+# pnl_entries as first released: net_profit was a plain column the API set
+_ORIGINAL_PNL_DDL = """
+    CREATE TABLE pnl_entries (
+        id INTEGER NOT NULL PRIMARY KEY,
+        listing_id INTEGER NOT NULL UNIQUE,
+        purchase_price FLOAT NOT NULL,
+        cleanup_cost FLOAT,
+        transport_cost FLOAT,
+        other_costs FLOAT,
+        gross_revenue FLOAT,
+        net_profit FLOAT,
+        notes TEXT,
+        closed_at DATETIME,
+        created_at DATETIME,
+        updated_at DATETIME
+    )
+"""
+
+
+@pytest.fixture(params=["fresh", "migrated"])
+def client(request, bind_db):
+    """TestClient for the P&L routes, on a fresh DB or one migrated by init_db."""
+    if request.param == "migrated":
+        with sqlite3.connect(bind_db) as conn:
+            conn.execute(_ORIGINAL_PNL_DDL)
+    database.init_db()
+    app = FastAPI()
+    app.include_router(pnl.router, prefix="/api/pnl")
+    with TestClient(app) as c:
+        yield c
+
+
+def _entry(client, pnl_id: int) -> dict:
+    return next(e for e in client.get("/api/pnl").json() if e["id"] == pnl_id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Schema
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _pnl_schema() -> tuple:
+    """(hidden flag of total_cost from table_xinfo, trigger names) of the test DB."""
+    with database.engine.connect() as conn:
+        hidden = {
+            row[1]: row[6] for row in conn.execute(text("PRAGMA table_xinfo(pnl_entries)"))
+        }["total_cost"]
+        triggers = {
+            row[0] for row in
+            conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+        }
+    return hidden, triggers
+
+
+def test_fresh_db_has_generated_column_and_triggers(bind_db):
+    database.init_db()
+    hidden, triggers = _pnl_schema()
+    assert hidden in (2, 3)  # generated (VIRTUAL or STORED)
+    assert set(database.PNL_TRIGGERS) <= triggers
+
+
+def test_migration_adds_column_triggers_and_fixes_existing_rows(bind_db):
+    with sqlite3.connect(bind_db) as conn:
+        conn.execute(_ORIGINAL_PNL_DDL)
+        conn.execute(
+            "INSERT INTO pnl_entries (id, listing_id, purchase_price, cleanup_cost,"
+            " transport_cost, other_costs, gross_revenue, net_profit)"
+            " VALUES (1, 10, 100, 10, NULL, 5, 300, 999)"  # stale net_profit
+        )
+
+    database.init_db()
+
+    hidden, triggers = _pnl_schema()
+    assert hidden == 2  # ALTER TABLE can only add VIRTUAL columns
+    assert set(database.PNL_TRIGGERS) <= triggers
+    with database.engine.connect() as conn:
+        total_cost, net_profit = conn.execute(
+            text("SELECT total_cost, net_profit FROM pnl_entries WHERE id = 1")
+        ).one()
+    assert total_cost == 115.0
+    assert net_profit == 185.0
+
+
+def test_init_db_is_idempotent(bind_db):
+    database.init_db()
+    database.init_db()  # signature matches: no-op
+    with database.engine.connect() as conn:
+        conn.execute(text("DELETE FROM _schema_version"))
+        conn.commit()
+    database.init_db()  # signature missing: migrations re-run without error
+    _, triggers = _pnl_schema()
+    assert set(database.PNL_TRIGGERS) <= triggers
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# API paths
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_create_sets_totals(client):
+    entry = client.post("/api/pnl", json={
+        "listing_id": 1, "purchase_price": 100, "cleanup_cost": 10, "transport_cost": 5,
+    }).json()
+    assert entry["total_cost"] == 115.0
+    assert entry["net_profit"] == -115.0
+    assert entry["inventory_count"] == 0
+
+
+def test_patch_recomputes_totals(client):
+    pnl_id = client.post("/api/pnl", json={"listing_id": 1, "purchase_price": 100}).json()["id"]
+
+    entry = client.patch(f"/api/pnl/{pnl_id}", json={"cleanup_cost": 20, "other_costs": 5}).json()
+    assert entry["total_cost"] == 125.0
+    assert entry["net_profit"] == -125.0
+
+    entry = client.patch(f"/api/pnl/{pnl_id}", json={"gross_revenue": 400}).json()
+    assert entry["total_cost"] == 125.0
+    assert entry["net_profit"] == 275.0
+
+
+def test_patch_of_unrelated_field_keeps_totals(client):
+    pnl_id = client.post("/api/pnl", json={"listing_id": 1, "purchase_price": 100}).json()["id"]
+    client.patch(f"/api/pnl/{pnl_id}", json={"gross_revenue": 150})
+
+    entry = client.patch(f"/api/pnl/{pnl_id}", json={
+        "notes": "sold out", "closed_at": "2030-01-02T03:04:05",
+    }).json()
+    assert entry["net_profit"] == 50.0
+    assert entry["closed_at"] == "2030-01-02T03:04:05"
+
+
+def test_inventory_item_updates_net_profit(client):
+    pnl_id = client.post("/api/pnl", json={"listing_id": 1, "purchase_price": 100}).json()["id"]
+
+    client.post(f"/api/pnl/{pnl_id}/inventory", json={"name": "Drill", "sold_price": 60})
+    client.post(f"/api/pnl/{pnl_id}/inventory", json={"name": "Lamp"})  # unsold
+
+    entry = _entry(client, pnl_id)
+    assert entry["gross_revenue"] == 60.0
+    assert entry["net_profit"] == -40.0
+    assert entry["inventory_count"] == 2
+
+
+def test_bulk_inventory_updates_net_profit(client):
+    pnl_id = client.post("/api/pnl", json={
+        "listing_id": 1, "purchase_price": 100, "transport_cost": 20,
+    }).json()["id"]
+
+    result = client.post(f"/api/pnl/{pnl_id}/inventory/bulk", json=[
+        {"name": "Drill", "sold_price": 60},
+        {"name": "Saw",   "sold_price": 90.5},
+        {"name": "Box"},
+    ]).json()
+    assert result["added"] == 3
+    assert result["gross_revenue"] == 150.5
+    assert result["net_profit"] == 30.5
+
+    entry = _entry(client, pnl_id)
+    assert entry["net_profit"] == 30.5
+    assert entry["inventory_count"] == 3
+
+
+def test_summary_uses_maintained_totals(client):
+    win = client.post("/api/pnl", json={"listing_id": 1, "purchase_price": 100}).json()["id"]
+    client.post("/api/pnl", json={"listing_id": 2, "purchase_price": 50, "cleanup_cost": 0.1})
+    client.patch(f"/api/pnl/{win}", json={"gross_revenue": 250.2})
+
+    summary = client.get("/api/pnl/summary").json()
+    assert summary["total_units"] == 2
+    assert summary["total_invested"] == 150.1
+    assert summary["total_revenue"] == 250.2
+    assert summary["total_net_profit"] == 100.1
+    assert summary["win_count"] == 1
+    assert summary["loss_count"] == 1
@@ -0,0 +1,129 @@
+"""
+Band edges of the heuristic recommender: current bid, bid count and time remaining.
+"""
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from app.ai.recommender import (
+    ScoringRow,
+    generate_recommendation,
+    generate_recommendations_batch,
+    recommendation_input_hash,
+)
+
+END_TIME = datetime(2030, 1, 1, 12, 0, 0)                     # naive UTC, as stored
+END_TS   = END_TIME.replace(tzinfo=timezone.utc).timestamp()
+NOW_TS   = END_TS - 72 * 3600                                 # 3 days out unless overridden
+
+
+def _row(**overrides) -> ScoringRow:
+    fields = dict(
+        id               = 1,
+        auction_type     = None,
+        unit_size        = "10x10",
+        unit_size_sqft   = 100.0,
+        current_bid      = 50.0,
+        bid_count        = 0,
+        auction_end_time = END_TIME,
+        description      = "boxes",
+        has_images       = True,
+    )
+    fields.update(overrides)
+    return ScoringRow(**fields)
+
+
+def _factors(listing: ScoringRow, now_ts: float = NOW_TS) -> dict:
+    """label → delta of every scoring factor (the summary header is dropped)."""
+    reasoning = orjson.loads(generate_recommendation(listing, now_ts=now_ts)["reasoning"])
+    return {f["label"]: f["delta"] for f in reasoning[1:]}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Current bid: < $100 · $100–200 · $200–400 · > $400 (upper bounds inclusive)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("bid, label, delta", [
+    (99.99,  "Bid under $100 ($100)", 15),
+    (100.0,  "Bid $100–200 ($100)",   10),
+    (200.0,  "Bid $100–200 ($200)",   10),
+    (400.0,  "Bid $200–400 ($400)",    5),
+    (400.01, "Bid over $400 ($400)", -10),
+])
+def test_bid_bands(bid, label, delta):
+    factors = _factors(_row(current_bid=bid))
+    assert factors[label] == delta
+    assert sum(k.startswith("Bid ") for k in factors) == 1
+
+
+def test_missing_bid_counts_as_zero():
+    assert _factors(_row(current_bid=None))["Bid under $100 ($0)"] == 15
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Bid count: 0–5 · 6–15 · 16–25 (no factor) · > 25
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("bid_count, label, delta", [
+    (5,  "5 bids — low competition",       10),
+    (6,  "6 bids — moderate competition",   5),
+    (15, "15 bids — moderate competition",  5),
+    (16, None,                           None),
+    (25, None,                           None),
+    (26, "26 bids — high competition",    -10),
+])
+def test_bid_count_bands(bid_count, label, delta):
+    factors = _factors(_row(bid_count=bid_count))
+    bid_count_labels = [k for k in factors if k.startswith(f"{bid_count} bids")]
+    if label is None:
+        assert bid_count_labels == []
+    else:
+        assert bid_count_labels == [label]
+        assert factors[label] == delta
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Time remaining: < 6 hrs (6 included) · 6–24 hrs (24 included) · > 24 hrs
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("hours, label, delta", [
+    (5.5,  "Under 6 hrs remaining", -5),
+    (6.0,  "Under 6 hrs remaining", -5),
+    (6.5,  "6–24 hrs remaining",     3),
+    (24.0, "6–24 hrs remaining",     3),
+    (24.5, "Over 24 hrs remaining",  5),
+])
+def test_time_remaining_bands(hours, label, delta):
+    factors = _factors(_row(), now_ts=END_TS - hours * 3600)
+    assert factors[label] == delta
+    assert sum(k.endswith("remaining") for k in factors) == 1
+
+
+def test_no_end_time_adds_no_time_factor():
+    assert not any(k.endswith("remaining") for k in _factors(_row(auction_end_time=None)))
+
+
+def test_input_hash_changes_only_across_a_time_band():
+    listing = _row()
+    at = lambda hours: recommendation_input_hash(listing, now_ts=END_TS - hours * 3600)
+    assert at(30) == at(48)
+    assert at(24.5) != at(24.0)
+    assert at(24.0) == at(6.5)
+    assert at(6.5) != at(6.0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Batch scoring
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_batch_matches_single_scoring():
+    listings = [
+        _row(id=1, current_bid=99.99, bid_count=5),
+        _row(id=2, current_bid=200.0, bid_count=16, description=None),
+        _row(id=3, current_bid=400.01, bid_count=26, has_images=False),
+    ]
+    batch = generate_recommendations_batch(listings, now_ts=NOW_TS)
+    assert [r["listing_id"] for r in batch] == [1, 2, 3]
+    for listing, rec in zip(listings, batch):
+        assert rec == {**generate_recommendation(listing, now_ts=NOW_TS), "listing_id": listing.id}
@@ -0,0 +1,109 @@
+"""
+Background scrape jobs: POST /api/scraper/run and GET /api/scraper/status/{job_id}.
+The scraper itself is stubbed; these tests cover the job bookkeeping.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import scraper as scraper_api
+from app.scraper.storage_treasures import StorageTreasuresScraper
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(scraper_api, "_JOBS", {})
+    app = FastAPI()
+    app.include_router(scraper_api.router, prefix="/api/scraper")
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def scrapes(monkeypatch):
+    """Stub fetch_and_save: records each call's kwargs and returns (0 new, 3 fetched)."""
+    calls: list = []
+
+    def fetch_and_save(self, **kwargs):
+        calls.append(kwargs)
+        return 0, 3
+
+    monkeypatch.setattr(StorageTreasuresScraper, "fetch_and_save", fetch_and_save)
+    return calls
+
+
+def test_job_reports_its_result(client, scrapes):
+    job_id = client.post("/api/scraper/run", json={"state": "FL"}).json()["job_id"]
+
+    assert client.get(f"/api/scraper/status/{job_id}").json() == {"state": "done", "result": {
+        "new_listings":              0,
+        "total_scraped":             3,
+        "recommendations_generated": 0,
+    }}
+    assert scrapes[0]["state"] == "FL"
+
+
+def test_auction_type_names_are_mapped_to_filter_ids(client, scrapes):
+    client.post("/api/scraper/run", json={"auction_types": ["Lien", "charity", "1", "private"]})
+    assert scrapes[0]["filter_types"] == "1,2,4"
+
+
+def test_failed_job_reports_the_error(client, monkeypatch):
+    def fetch_and_save(self, **kwargs):
+        raise RuntimeError("blocked by the site")
+
+    monkeypatch.setattr(StorageTreasuresScraper, "fetch_and_save", fetch_and_save)
+    job_id = client.post("/api/scraper/run", json={}).json()["job_id"]
+
+    assert client.get(f"/api/scraper/status/{job_id}").json() == {
+        "state": "error", "error": "blocked by the site",
+    }
+
+
+def test_unknown_job_is_404(client):
+    assert client.get("/api/scraper/status/nope").status_code == 404
+
+
+def test_full_job_table_evicts_the_oldest_finished_job(client, scrapes, monkeypatch):
+    monkeypatch.setattr(scraper_api, "_JOBS_MAX", 3)
+    first, second, third = (client.post("/api/scraper/run", json={}).json()["job_id"]
+                            for _ in range(3))
+
+    fourth = client.post("/api/scraper/run", json={}).json()["job_id"]
+    assert list(scraper_api._JOBS) == [second, third, fourth]
+    assert client.get(f"/api/scraper/status/{first}").status_code == 404
+
+
+def test_running_jobs_are_never_evicted(client, scrapes, monkeypatch):
+    monkeypatch.setattr(scraper_api, "_JOBS_MAX", 3)
+    scraper_api._JOBS.update({
+        "running-1": {"state": "running"},
+        "finished":  {"state": "done", "result": {}},
+        "running-2": {"state": "running"},
+    })
+
+    job_id = client.post("/api/scraper/run", json={}).json()["job_id"]
+    assert list(scraper_api._JOBS) == ["running-1", "running-2", job_id]
+
+    scraper_api._JOBS["finished-2"] = {"state": "error", "error": "x"}
+    del scraper_api._JOBS[job_id]
+    scraper_api._JOBS["running-3"] = {"state": "running"}
+    client.post("/api/scraper/run", json={})
+    assert "running-1" in scraper_api._JOBS and "finished-2" not in scraper_api._JOBS
+
+
+def test_jobs_share_one_scraper(client, monkeypatch):
+    seen: list = []
+
+    def fetch_and_save(self, **kwargs):
+        seen.append(self)
+        return 0, 0
+
+    monkeypatch.setattr(StorageTreasuresScraper, "fetch_and_save", fetch_and_save)
+    monkeypatch.setattr(scraper_api, "_SCRAPER", None)
+    client.post("/api/scraper/run", json={})
+    client.post("/api/scraper/run", json={})
+
+    assert len(seen) == 2 and seen[0] is seen[1]
+    scraper_api.close_scraper()
+    assert scraper_api._SCRAPER is None
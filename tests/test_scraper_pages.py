@@ -0,0 +1,39 @@
+"""
+StorageTreasuresScraper._fetch_all_pages: pages 2+ share a small
+concurrency cap and come back in page order.
+"""
+import asyncio
+
+import httpx
+
+from app.scraper import storage_treasures
+from app.scraper.storage_treasures import PAGE_SIZE, StorageTreasuresScraper
+
+
+def test_pages_are_fetched_a_few_at_a_time(monkeypatch):
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json={"auctions": [request.url.params["page_num"]]})
+
+    class MockClient(httpx.AsyncClient):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = httpx.MockTransport(handler)
+            super().__init__(*args, **kwargs)
+
+    async def page1(self, client, params):
+        return {"auctions": ["1"], "total_records": 9 * PAGE_SIZE}, {"x-test": "1"}
+
+    monkeypatch.setattr(storage_treasures.httpx, "AsyncClient", MockClient)
+    monkeypatch.setattr(StorageTreasuresScraper, "_try_httpx_page1", page1)
+    monkeypatch.setattr(storage_treasures, "PAGE_FETCH_CONCURRENCY", 3)
+
+    scraper = StorageTreasuresScraper(delay=0)
+    auctions = asyncio.run(scraper._fetch_all_pages("FL", None, 50, max_pages=9))
+
+    assert auctions == [str(page) for page in range(1, 10)]
+    assert in_flight["max"] == 3
@@ -0,0 +1,104 @@
+"""
+StorageTreasuresScraper._save: upserting scraped auctions into listings.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.models import Listing, ListingImage, utc_now
+from app.scraper.storage_treasures import StorageTreasuresScraper, _normalize
+
+
+def _auction(auction_id: int, bid: float = 50.0, bids: int = 0, thumb: bool = True,
+             days_left: float = 3, contents: str = "tools") -> dict:
+    """One auction as the API returns it (only the fields _normalize reads)."""
+    end = utc_now() + timedelta(days=days_left)
+    return {
+        "auction_id":    auction_id,
+        "expire_date":   {"utc": {"datetime": end.strftime("%Y-%m-%d %H:%M:%S")}},
+        "current_bid":   {"amount": bid},
+        "total_bids":    bids,
+        "unit_size":     "10x10",
+        "unit_volume":   100,
+        "facility_name": "Fac",
+        "city":          "Tampa",
+        "state":         "FL",
+        "unit_number":   auction_id,
+        "unit_contents": contents,
+        "image":         {"image_path": f"https://cdn.example/{auction_id}.jpg"} if thumb else None,
+        "type":          1,
+    }
+
+
+def _save(db, auctions: list) -> int:
+    new_count = StorageTreasuresScraper()._save(auctions, db)
+    db.commit()
+    return new_count
+
+
+def _listings(db) -> dict:
+    return {l.external_id: l for l in db.scalars(select(Listing))}
+
+
+def _image_urls(db) -> list:
+    return sorted(db.scalars(select(ListingImage.url)))
+
+
+def test_new_listings_are_counted_and_saved(db):
+    assert _save(db, [_auction(1), _auction(2, bid=75, bids=3), _auction(3)]) == 3
+
+    listings = _listings(db)
+    assert sorted(listings) == ["1", "2", "3"]
+    assert listings["2"].current_bid == 75.0
+    assert listings["2"].bid_count == 3
+    assert listings["2"].auction_type == "lien"
+
+
+def test_auction_repeated_across_pages_is_saved_once_with_later_bid(db):
+    pages = [_auction(1, bid=50, bids=1), _auction(2), _auction(1, bid=80, bids=4)]
+    assert _save(db, pages) == 2
+
+    listing = _listings(db)["1"]
+    assert (listing.current_bid, listing.bid_count) == (80.0, 4)
+    assert db.scalar(select(func.count(ListingImage.id))) == 2
+
+
+def test_unchanged_listings_are_not_rewritten(db):
+    _save(db, [_auction(1), _auction(2)])
+    before = {ext: l.updated_at for ext, l in _listings(db).items()}
+
+    assert _save(db, [_auction(1), _auction(2)]) == 0
+    db.expire_all()
+    assert {ext: l.updated_at for ext, l in _listings(db).items()} == before
+
+
+def test_changed_listing_gets_only_live_fields_refreshed(db):
+    _save(db, [_auction(1, contents="tools")])
+    before = _listings(db)["1"].updated_at
+
+    assert _save(db, [_auction(1, bid=120, bids=6, contents="mattress")]) == 0
+    db.expire_all()
+    listing = _listings(db)["1"]
+    assert (listing.current_bid, listing.bid_count) == (120.0, 6)
+    assert listing.description == "tools"
+    assert listing.updated_at > before
+
+
+def test_thumbnails_are_added_only_for_new_listings(db):
+    _save(db, [_auction(1), _auction(2)])
+
+    assert _save(db, [_auction(1), _auction(2, bid=90), _auction(3), _auction(4, thumb=False)]) == 2
+    assert _image_urls(db) == [f"https://cdn.example/{i}.jpg" for i in (1, 2, 3)]
+
+
+def test_ended_and_id_less_auctions_are_skipped(db):
+    ended = _auction(1, days_left=-1)
+    no_id = {**_auction(2), "auction_id": ""}
+    assert _save(db, [ended, no_id]) == 0
+    assert _listings(db) == {}
+
+
+def test_expiry_with_utc_offset_is_stored_as_naive_utc():
+    auction = {**_auction(1), "expire_date": {"utc": {"datetime": "2030-01-01T02:00:00+02:00"}}}
+    n = _normalize(auction, utc_now())
+    assert n.auction_end_time == datetime(2030, 1, 1, 0, 0, 0)